@@ -1,5 +1,7 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.database import fetch_records, schema_columns, update_returning
 from app.model import models
 from app.dependencies import utils
 from . import schemas
@@ -10,8 +12,8 @@ def get_admin_by_email(db: Session, email: str):
 def get_admin_by_cpf(db: Session, cpf: str):
     return db.query(models.Admin).filter(models.Admin.cpf == cpf).first()
 
-def create_admin(db: Session, admin: schemas.AdminCreate):
-    hashed_pw = utils.hash_password(admin.password)
+def create_admin(db: Session, admin: schemas.AdminCreate, hashed_password: str = None):
+    hashed_pw = hashed_password or utils.hash_password(admin.password)
 
     db_admin = models.Admin(
         nome=admin.nome,
@@ -25,26 +27,14 @@ def create_admin(db: Session, admin: schemas.AdminCreate):
     db.refresh(db_admin)
     return db_admin
 
-def update_admin(db: Session, admin_id: int, admin_update: schemas.AdminUpdate):
-    db_admin = db.query(models.Admin).filter(models.Admin.id == admin_id).first()
+def update_admin(db: Session, admin_id: int, admin_update: schemas.AdminUpdate, hashed_password: str = None):
+    values = admin_update.model_dump(exclude={"password"}, exclude_none=True)
+    if hashed_password is not None:
+        values["hashed_password"] = hashed_password
+    elif admin_update.password is not None:
+        values["hashed_password"] = utils.hash_password(admin_update.password)
 
-    if not db_admin:
-        return None
-
-    if admin_update.nome is not None:
-        db_admin.nome = admin_update.nome
-    if admin_update.email is not None:
-        db_admin.email = admin_update.email
-    if admin_update.cpf is not None:
-        db_admin.cpf = admin_update.cpf
-    if admin_update.telefone is not None:
-        db_admin.telefone = admin_update.telefone
-    if admin_update.password is not None:
-        db_admin.hashed_password = utils.hash_password(admin_update.password)
-
-    db.commit()
-    db.refresh(db_admin)
-    return db_admin
+    return update_returning(db, models.Admin, admin_id, values)
 
 def delete_admin(db: Session, admin_id: int):
     db_admin = db.query(models.Admin).filter(models.Admin.id == admin_id).first()
@@ -58,3 +48,6 @@ def delete_admin(db: Session, admin_id: int):
 
 def get_admins(db: Session):
     return db.query(models.Admin).all()
+
+def get_admins_records(db: Session):
+    return fetch_records(db, select(*schema_columns(models.Admin, schemas.Admin)))
@@ -1,27 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.database import get_db
 from . import schemas, functions
 from fastapi import APIRouter, Depends
+from app.dependencies import utils
 from app.dependencies.auth import get_current_admin
 from app.model import models
 
 router = APIRouter(prefix="/admins", tags=["Admins"])
 
-@router.post("/", response_model=schemas.Admin)
-def register_admin(admin: schemas.AdminCreate, db: Session = Depends(get_db)):
-    if functions.get_admin_by_email(db, admin.email):
-        raise HTTPException(status_code=400, detail="Email já registrado")
-    if functions.get_admin_by_cpf(db, admin.cpf):
-        raise HTTPException(status_code=400, detail="CPF já registrado")
-    return functions.create_admin(db, admin)
+def _check_new_admin(db: Session, admin: schemas.AdminCreate):
+    try:
+        if functions.get_admin_by_email(db, admin.email):
+            raise HTTPException(status_code=400, detail="Email já registrado")
+        if functions.get_admin_by_cpf(db, admin.cpf):
+            raise HTTPException(status_code=400, detail="CPF já registrado")
+    finally:
+        # Hands the connection back to the pool while the password is hashed
+        db.close()
 
-@router.put("/{admin_id}", response_model=schemas.Admin)
-def edit_admin(admin_id: int, admin_update: schemas.AdminUpdate, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
-    admin = functions.update_admin(db, admin_id, admin_update)
+def _create_admin(db: Session, admin: schemas.AdminCreate, hashed_password: str):
+    return schemas.Admin.model_validate(functions.create_admin(db, admin, hashed_password), from_attributes=True)
+
+def _update_admin(db: Session, admin_id: int, admin_update: schemas.AdminUpdate, hashed_password: str):
+    admin = functions.update_admin(db, admin_id, admin_update, hashed_password)
     if not admin:
         raise HTTPException(status_code=404, detail="Admin não encontrado")
-    return admin
+    return schemas.Admin.model_validate(admin, from_attributes=True)
+
+@router.post("/", response_model=schemas.Admin)
+async def register_admin(admin: schemas.AdminCreate, db: Session = Depends(get_db)):
+    await run_in_threadpool(_check_new_admin, db, admin)
+    hashed_pw = await utils.hash_password_async(admin.password)
+    return await run_in_threadpool(_create_admin, db, admin, hashed_pw)
+
+@router.put("/{admin_id}", response_model=schemas.Admin)
+async def edit_admin(admin_id: int, admin_update: schemas.AdminUpdate, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
+    hashed_pw = None
+    if admin_update.password is not None:
+        hashed_pw = await utils.hash_password_async(admin_update.password)
+    return await run_in_threadpool(_update_admin, db, admin_id, admin_update, hashed_pw)
 
 @router.delete("/{admin_id}", response_model=schemas.Admin)
 def remove_admin(admin_id: int, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
@@ -0,0 +1,80 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+class CacheBackend(ABC):
+    # Backends doing network I/O are called from a worker thread on async routes
+    blocking = False
+
+    @abstractmethod
+    def get_many(self, keys: list[str]) -> list[Optional[bytes]]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float = None):
+        ...
+
+    @abstractmethod
+    def add(self, key: str, value: bytes) -> bool:
+        # Sets key only if it is missing; True when it was set
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        ...
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key])[0]
+
+    def close(self):
+        pass
+
+class MemoryBackend(CacheBackend):
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get_many(self, keys: list[str]) -> list[Optional[bytes]]:
+        now = time.monotonic()
+        with self._lock:
+            return [self._live(key, now) for key in keys]
+
+    def _store(self, key: str, value: bytes, ttl: float = None):
+        self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def set(self, key: str, value: bytes, ttl: float = None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key: str, value: bytes) -> bool:
+        with self._lock:
+            if self._live(key, time.monotonic()) is not None:
+                return False
+            self._store(key, value)
+            return True
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,144 @@
+import queue
+import socket
+from typing import Optional
+from urllib.parse import unquote, urlparse
+
+from .backends import CacheBackend
+
+class RespError(Exception):
+    pass
+
+def encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode("utf-8")
+        elif not isinstance(arg, bytes):
+            arg = str(arg).encode("ascii")
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+def read_reply(reader):
+    line = reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by the cache server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode("utf-8")
+    if kind == b"-":
+        raise RespError(payload.decode("utf-8"))
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length == -1:
+            return None
+        data = reader.read(length + 2)
+        if len(data) != length + 2:
+            raise ConnectionError("Connection closed by the cache server")
+        return data[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length == -1:
+            return None
+        return [read_reply(reader) for _ in range(length)]
+    raise RespError(f"Unexpected reply type {kind!r}")
+
+class _Connection:
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def execute(self, *args):
+        self.sock.sendall(encode_command(*args))
+        return read_reply(self.reader)
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+# Speaks the Redis protocol (RESP2), so it works against Redis, Valkey, KeyDB...
+class RespBackend(CacheBackend):
+    blocking = True
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0, password: str = None,
+                 timeout: float = 0.5, max_idle: int = 16, prefix: str = ""):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.prefix = prefix
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs):
+        parsed = urlparse(url)
+        return cls(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip("/") or 0),
+            password=unquote(parsed.password) if parsed.password else None,
+            **kwargs,
+        )
+
+    def _connect(self) -> _Connection:
+        connection = _Connection(self.host, self.port, self.timeout)
+        try:
+            if self.password:
+                connection.execute("AUTH", self.password)
+            if self.db:
+                connection.execute("SELECT", self.db)
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def execute(self, *args):
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        try:
+            reply = connection.execute(*args)
+        except RespError:
+            self._release(connection)
+            raise
+        except Exception:
+            # The stream may hold half a reply, so the connection can't be reused
+            connection.close()
+            raise
+        self._release(connection)
+        return reply
+
+    def _release(self, connection: _Connection):
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def get_many(self, keys: list[str]) -> list[Optional[bytes]]:
+        if not keys:
+            return []
+        return self.execute("MGET", *(self.prefix + key for key in keys))
+
+    def set(self, key: str, value: bytes, ttl: float = None):
+        if ttl:
+            self.execute("SET", self.prefix + key, value, "PX", max(1, int(ttl * 1000)))
+        else:
+            self.execute("SET", self.prefix + key, value)
+
+    def add(self, key: str, value: bytes) -> bool:
+        return self.execute("SET", self.prefix + key, value, "NX") is not None
+
+    def delete(self, *keys: str):
+        if keys:
+            self.execute("DEL", *(self.prefix + key for key in keys))
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
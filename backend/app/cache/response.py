@@ -0,0 +1,253 @@
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+import uuid
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic_core import to_json
+from sqlalchemy import event
+
+from app import compression
+from app.database import Base
+from app.dependencies import etag
+from app.monitoring.metrics import registry
+from .backends import CacheBackend, MemoryBackend
+from .resp import RespBackend
+
+# memory:// keeps a per-worker LRU; redis://host:port/db shares entries (and
+# invalidations) across every worker and node
+CACHE_URL = os.getenv("CACHE_URL", "memory://")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "vagas-api:")
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "10"))
+
+logger = logging.getLogger("app.cache")
+
+response_cache_lookups_total = registry.counter(
+    "response_cache_lookups_total", "Response cache lookups by route and result", ("route", "result"),
+)
+response_cache_errors_total = registry.counter(
+    "response_cache_errors_total", "Cache backend failures; the request is served uncached", ("operation",),
+)
+
+def create_backend(url: str) -> CacheBackend:
+    if url.startswith("memory://"):
+        return MemoryBackend(CACHE_MAX_ENTRIES)
+    if url.startswith("redis://"):
+        return RespBackend.from_url(url, prefix=CACHE_KEY_PREFIX)
+    raise ValueError(f"Unsupported CACHE_URL: {url}")
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend() -> CacheBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(CACHE_URL)
+        return _backend
+
+def set_backend(backend: CacheBackend):
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    if previous is not None and previous is not backend:
+        previous.close()
+
+# Every tag holds a random token that is part of the keys of the entries it
+# covers. Invalidating replaces the token, so old entries are simply never read
+# again and expire on their own; a tag evicted by the backend gets a fresh token
+# and can't bring them back either.
+ALL_TAGS = "*"
+
+def _tag_key(tag: str) -> str:
+    return f"tag:{tag}"
+
+def _tag_tokens(backend: CacheBackend, tags) -> list[str]:
+    keys = [_tag_key(tag) for tag in tags]
+    tokens = backend.get_many(keys)
+    if any(token is None for token in tokens):
+        for key, token in zip(keys, tokens):
+            if token is None:
+                backend.add(key, uuid.uuid4().hex.encode("ascii"))
+        tokens = backend.get_many(keys)
+    return [token.decode("ascii") if token is not None else uuid.uuid4().hex for token in tokens]
+
+def invalidate(*tags: str):
+    backend = get_backend()
+    try:
+        for tag in tags:
+            backend.set(_tag_key(tag), uuid.uuid4().hex.encode("ascii"))
+    except Exception:
+        # Entries of these tags stay until their TTL runs out
+        response_cache_errors_total.inc("invalidate")
+        logger.warning("Could not invalidate cache tags %s", tags, exc_info=True)
+
+def invalidate_all(*args, **kwargs):
+    invalidate(ALL_TAGS)
+
+# Recreating the schema (tests, benchmark seeding) makes every cached response stale
+event.listen(Base.metadata, "after_create", invalidate_all)
+event.listen(Base.metadata, "after_drop", invalidate_all)
+
+def _entry_key(route: str, tags, request: Request) -> str:
+    backend = get_backend()
+    query = sorted(request.query_params.multi_items())
+    identity = json.dumps([route, request.url.path, query, _tag_tokens(backend, (ALL_TAGS, *tags))])
+    return "resp:" + hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+def _pack(status: int, headers: list, body: bytes) -> bytes:
+    return json.dumps({"status": status, "headers": headers}).encode("utf-8") + b"\n" + body
+
+def _unpack(entry: bytes):
+    head, _, body = entry.partition(b"\n")
+    meta = json.loads(head)
+    return meta["status"], meta["headers"], body
+
+def _variant_key(key: str, encoding: str) -> str:
+    return f"{key}:{encoding}"
+
+def _replay(entry: bytes, variant, encoding, request: Request):
+    # The response for a stored entry, plus its compressed form when it had to
+    # be compressed now; it is stored next to the entry for the following hits
+    status, headers, body = _unpack(entry)
+    headers = dict(headers)
+    version = headers.get("etag")
+    if version and etag.none_match(request.headers.get("if-none-match"), version.strip('"')):
+        kept = {name: value for name, value in headers.items() if name in ("etag", "cache-control")}
+        return Response(status_code=304, headers=kept), None
+
+    fresh = None
+    def compress_body(encoding):
+        nonlocal fresh
+        if variant is not None:
+            return variant
+        fresh = compression.compress(body, encoding)
+        return fresh
+
+    content, extra = compression.encoded(body, headers.get("content-type"), encoding, compress_body, headers.get("etag"))
+    return Response(content=content, status_code=status, headers={**headers, **extra}), fresh
+
+def _render(result, response: Response):
+    # The final response for what the endpoint returned, plus the cache entry
+    # for it when it is a cacheable 200
+    if isinstance(result, Response):
+        if result.status_code != 200 or not hasattr(result, "body"):
+            return result, None
+        headers = [(name, value) for name, value in result.headers.items() if name != "content-length"]
+        return result, _pack(200, headers, result.body)
+
+    if response.status_code not in (None, 200):
+        return result, None
+    body = to_json(result)
+    headers = [(name, value) for name, value in response.headers.items() if name != "content-length"]
+    headers.append(("content-type", "application/json"))
+    return Response(content=body, headers=dict(headers)), _pack(200, headers, body)
+
+def _lookup(route: str, tags, request: Request, encoding):
+    # The entry and, in the same round trip, its form compressed for this client
+    try:
+        key = _entry_key(route, tags, request)
+        if encoding is None:
+            entry, variant = get_backend().get(key), None
+        else:
+            entry, variant = get_backend().get_many([key, _variant_key(key, encoding)])
+    except Exception:
+        response_cache_errors_total.inc("get")
+        logger.warning("Cache lookup failed for %s", route, exc_info=True)
+        return None, None, None
+    response_cache_lookups_total.inc(route, "hit" if entry is not None else "miss")
+    return key, entry, variant
+
+def _store(entries: dict, ttl: float):
+    try:
+        for key, value in entries.items():
+            get_backend().set(key, value, ttl)
+    except Exception:
+        response_cache_errors_total.inc("set")
+        logger.warning("Cache store failed", exc_info=True)
+
+def _serve(key, entry, variant, encoding, request: Request):
+    # The response for an entry and what still has to be stored for it
+    response, fresh = _replay(entry, variant, encoding, request)
+    pending = {}
+    if fresh is not None:
+        pending[_variant_key(key, encoding)] = fresh
+    return response, pending
+
+def cached(ttl: float, tags=()):
+    # Caches the serialized 200 responses of a public GET route, keyed by path,
+    # query string and the current tokens of its tags. Tags may name path
+    # parameters ("experiencias:{user_id}"). Compressed forms are cached next
+    # to each entry, one per encoding. Must sit below the route decorator; the
+    # endpoint should return schema objects or a Response.
+    def decorator(func):
+        route = func.__name__
+        signature = inspect.signature(func)
+        parameters = list(signature.parameters.values())
+        request_name = next((p.name for p in parameters if p.annotation is Request), None)
+        response_name = next((p.name for p in parameters if p.annotation is Response), None)
+        if request_name is None:
+            parameters.append(inspect.Parameter("_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+        if response_name is None:
+            parameters.append(inspect.Parameter("_cache_response", inspect.Parameter.KEYWORD_ONLY, annotation=Response))
+
+        def split(kwargs):
+            request = kwargs[request_name] if request_name else kwargs.pop("_cache_request")
+            response = kwargs[response_name] if response_name else kwargs.pop("_cache_response")
+            return request, response
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(**kwargs):
+                request, response = split(kwargs)
+                route_tags = [tag.format(**kwargs) for tag in tags]
+                encoding = compression.negotiate(request.headers.get("accept-encoding"))
+                if get_backend().blocking:
+                    key, entry, variant = await run_in_threadpool(_lookup, route, route_tags, request, encoding)
+                else:
+                    key, entry, variant = _lookup(route, route_tags, request, encoding)
+
+                if entry is not None:
+                    result, pending = _serve(key, entry, variant, encoding, request)
+                else:
+                    result, entry = _render(await func(**kwargs), response)
+                    if key is None or entry is None:
+                        return result
+                    result, pending = _serve(key, entry, None, encoding, request)
+                    pending[key] = entry
+
+                if pending:
+                    if get_backend().blocking:
+                        await run_in_threadpool(_store, pending, ttl)
+                    else:
+                        _store(pending, ttl)
+                return result
+        else:
+            @functools.wraps(func)
+            def wrapper(**kwargs):
+                request, response = split(kwargs)
+                encoding = compression.negotiate(request.headers.get("accept-encoding"))
+                key, entry, variant = _lookup(route, [tag.format(**kwargs) for tag in tags], request, encoding)
+
+                if entry is not None:
+                    result, pending = _serve(key, entry, variant, encoding, request)
+                else:
+                    result, entry = _render(func(**kwargs), response)
+                    if key is None or entry is None:
+                        return result
+                    result, pending = _serve(key, entry, None, encoding, request)
+                    pending[key] = entry
+
+                if pending:
+                    _store(pending, ttl)
+                return result
+
+        wrapper.__signature__ = signature.replace(parameters=parameters)
+        return wrapper
+    return decorator
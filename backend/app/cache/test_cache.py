@@ -0,0 +1,239 @@
+import socketserver
+import threading
+import time
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+import pytest
+from app import compression
+from app.cache import response as response_cache
+from app.cache.backends import MemoryBackend
+from app.cache.resp import RespBackend, RespError, read_reply
+from app.competencia.schemas import Competencia
+from app.responses import ORJSONResponse
+
+# In-process fake speaking just enough RESP2 for RespBackend
+class FakeRespServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeRespHandler)
+        self.data = {}
+        self.lock = threading.Lock()
+        self.commands = []
+
+    def live(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+class FakeRespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except ConnectionError:
+                return
+            self.wfile.write(self.reply(command))
+
+    def reply(self, command):
+        server = self.server
+        name, args = command[0].upper(), command[1:]
+        with server.lock:
+            server.commands.append(name)
+            if name == b"PING":
+                return b"+PONG\r\n"
+            if name == b"GET":
+                return self.bulk(server.live(args[0]))
+            if name == b"MGET":
+                return b"*%d\r\n" % len(args) + b"".join(self.bulk(server.live(key)) for key in args)
+            if name == b"SET":
+                key, value, options = args[0], args[1], [option.upper() for option in args[2:]]
+                if b"NX" in options and server.live(key) is not None:
+                    return b"$-1\r\n"
+                expires_at = None
+                if b"PX" in options:
+                    expires_at = time.monotonic() + int(options[options.index(b"PX") + 1]) / 1000
+                server.data[key] = (value, expires_at)
+                return b"+OK\r\n"
+            if name == b"DEL":
+                removed = sum(server.data.pop(key, None) is not None for key in args)
+                return b":%d\r\n" % removed
+            return b"-ERR unknown command '%s'\r\n" % name
+
+    @staticmethod
+    def bulk(value):
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+@pytest.fixture
+def resp_server():
+    server = FakeRespServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def backend():
+    backend = MemoryBackend(16)
+    response_cache.set_backend(backend)
+    yield backend
+    response_cache.set_backend(MemoryBackend(response_cache.CACHE_MAX_ENTRIES))
+
+app = FastAPI()
+calls = {"items": 0, "owner": 0}
+
+@app.get("/items")
+@response_cache.cached(ttl=60, tags=("items",))
+async def list_items(response: Response, kind: str = "all"):
+    calls["items"] += 1
+    response.headers["ETag"] = '"7"'
+    return [{"kind": kind, "n": calls["items"]}]
+
+@app.get("/owners/{owner_id}/items")
+@response_cache.cached(ttl=60, tags=("items:{owner_id}",))
+def list_owner_items(owner_id: int):
+    calls["owner"] += 1
+    if owner_id == 0:
+        return Response(status_code=404)
+    return {"owner": owner_id, "n": calls["owner"]}
+
+@app.get("/big")
+@response_cache.cached(ttl=60, tags=("items",))
+def list_big(response: Response):
+    calls["items"] += 1
+    response.headers["ETag"] = '"9"'
+    return [{"id": i, "nome": f"Item {i}"} for i in range(200)]
+
+app.add_middleware(compression.CompressionMiddleware)
+
+client = TestClient(app)
+
+def test_memory_backend_lru_and_ttl(monkeypatch):
+    backend = MemoryBackend(2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    assert backend.get("a") == b"1"
+    backend.set("c", b"3")
+    assert backend.get_many(["a", "b", "c"]) == [b"1", None, b"3"]
+
+    assert not backend.add("a", b"x")
+    backend.delete("a")
+    assert backend.add("a", b"x")
+
+    now = time.monotonic()
+    backend.set("d", b"4", ttl=5)
+    monkeypatch.setattr(time, "monotonic", lambda: now + 10)
+    assert backend.get("d") is None
+    assert len(backend) == 1
+
+def test_resp_backend_against_fake_server(resp_server):
+    host, port = resp_server.server_address
+    backend = RespBackend.from_url(f"redis://{host}:{port}/0", prefix="t:")
+
+    backend.set("a", b"1")
+    backend.set("b", b"\r\n2", ttl=0.05)
+    assert backend.get_many(["a", "b", "c"]) == [b"1", b"\r\n2", None]
+    assert backend.add("c", b"3")
+    assert not backend.add("c", b"4")
+    assert resp_server.live(b"t:c") == b"3"
+
+    time.sleep(0.06)
+    assert backend.get("b") is None
+    backend.delete("a", "c")
+    assert backend.get_many(["a", "c"]) == [None, None]
+    with pytest.raises(RespError):
+        backend.execute("FLUSHALL")
+
+    # One pooled connection served every command, errors included
+    assert backend._idle.qsize() == 1
+    backend.close()
+
+def test_cached_route_hits_and_invalidates(backend):
+    calls["items"] = 0
+    first = client.get("/items", params={"kind": "a"})
+    assert first.json() == [{"kind": "a", "n": 1}]
+    assert client.get("/items", params={"kind": "a"}).content == first.content
+    assert client.get("/items", params={"kind": "a"}).headers["etag"] == '"7"'
+    assert client.get("/items", params={"kind": "a"}, headers={"If-None-Match": '"7"'}).status_code == 304
+    assert client.get("/items", params={"kind": "b"}).json() == [{"kind": "b", "n": 2}]
+    assert calls["items"] == 2
+
+    response_cache.invalidate("items")
+    assert client.get("/items", params={"kind": "a"}).json() == [{"kind": "a", "n": 3}]
+
+def test_cached_route_formats_tags_and_skips_errors(backend):
+    calls["owner"] = 0
+    assert client.get("/owners/1/items").json() == {"owner": 1, "n": 1}
+    assert client.get("/owners/2/items").json() == {"owner": 2, "n": 2}
+    assert client.get("/owners/0/items").status_code == 404
+    assert client.get("/owners/0/items").status_code == 404
+    assert calls["owner"] == 4
+
+    response_cache.invalidate("items:1")
+    assert client.get("/owners/1/items").json() == {"owner": 1, "n": 5}
+    assert client.get("/owners/2/items").json() == {"owner": 2, "n": 2}
+
+def test_orjson_response_renders_schemas_and_passes_bytes():
+    response = ORJSONResponse({"competencias": [Competencia(id=1, nome="Programação")], 2: 1.0})
+    assert response.body == '{"competencias":[{"nome":"Programação","id":1}],"2":1.0}'.encode()
+    assert response.headers["content-type"] == "application/json"
+
+    cached_body = b'[{"id":1}]'
+    assert ORJSONResponse(cached_body).body == cached_body
+
+def test_cached_route_stores_compressed_variants(backend, monkeypatch):
+    compressed = []
+    original = compression.compress
+    monkeypatch.setattr(compression, "compress", lambda body, encoding: compressed.append(encoding) or original(body, encoding))
+    calls["items"] = 0
+
+    first = client.get("/big", headers={"Accept-Encoding": "br"})
+    assert first.headers["content-encoding"] == "br"
+    assert len(first.json()) == 200
+    assert client.get("/big", headers={"Accept-Encoding": "br"}).content == first.content
+    assert client.get("/big", headers={"Accept-Encoding": "gzip"}).headers["content-encoding"] == "gzip"
+    assert client.get("/big", headers={"Accept-Encoding": "gzip"}).content == first.content
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+    # One render, and each encoding compressed once
+    assert calls["items"] == 1
+    assert compressed == ["br", "gzip"]
+
+def test_compressed_variants_have_their_own_etags(backend):
+    br = client.get("/big", headers={"Accept-Encoding": "br"})
+    assert br.headers["etag"] == '"9-br"'
+    assert client.get("/big", headers={"Accept-Encoding": "gzip"}).headers["etag"] == '"9-gzip"'
+    assert client.get("/big", headers={"Accept-Encoding": "identity"}).headers["etag"] == '"9"'
+
+    revalidated = client.get("/big", headers={"Accept-Encoding": "br", "If-None-Match": '"9-br"'})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == '"9-br"'
+    assert revalidated.headers["vary"] == "Accept-Encoding"
+    # Switching encodings still revalidates the same version
+    revalidated = client.get("/big", headers={"Accept-Encoding": "gzip", "If-None-Match": '"9-br"'})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == '"9"'
+
+def test_cached_route_fails_open(resp_server):
+    host, port = resp_server.server_address
+    response_cache.set_backend(RespBackend(host, port))
+    try:
+        calls["items"] = 0
+        client.get("/items")
+        assert client.get("/items").json() == [{"kind": "all", "n": 1}]
+
+        # With the server gone every request goes to the endpoint
+        response_cache.set_backend(RespBackend(host, 1, timeout=0.05))
+        assert client.get("/items").json() == [{"kind": "all", "n": 2}]
+        assert client.get("/items").json() == [{"kind": "all", "n": 3}]
+    finally:
+        response_cache.set_backend(MemoryBackend(response_cache.CACHE_MAX_ENTRIES))
@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import compression
+from app.model import models
+from . import schemas
+
+# Each worker keeps its own copy of the catalog, already serialized. Writes made
+# through this worker invalidate it at once; after CATALOG_TTL seconds the copy
+# is revalidated against the collection version, which bounds how long changes
+# made by other workers can go unnoticed.
+CATALOG_TTL = float(os.getenv("COMPETENCIA_CACHE_TTL", "30"))
+
+_catalog_adapter = TypeAdapter(list[schemas.Competencia])
+
+@dataclass(frozen=True)
+class Catalog:
+    version: int
+    body: bytes
+    size: int
+    # Compressed forms of body by encoding, filled on first use
+    variants: dict = field(default_factory=dict, compare=False, repr=False)
+
+    def compressed(self, encoding: str) -> bytes:
+        variant = self.variants.get(encoding)
+        if variant is None:
+            variant = self.variants[encoding] = compression.compress(self.body, encoding)
+        return variant
+
+class CatalogCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._catalog = None
+        self._checked_at = None
+
+    def get(self, db: Session, load_version, load_rows) -> Catalog:
+        with self._lock:
+            catalog = self._catalog
+            if catalog is not None and time.monotonic() - self._checked_at < self.ttl:
+                self.hits += 1
+                return catalog
+
+        # Version first, so the cached body is never older than its version
+        version = load_version(db)
+        with self._lock:
+            if version is not None and self._catalog is not None and self._catalog.version == version:
+                self._checked_at = time.monotonic()
+                self.revalidations += 1
+                return self._catalog
+
+        rows = _catalog_adapter.validate_python(load_rows(db), from_attributes=True)
+        catalog = Catalog(version, _catalog_adapter.dump_json(rows), len(rows))
+        with self._lock:
+            self._catalog = catalog
+            self._checked_at = time.monotonic()
+            self.misses += 1
+        return catalog
+
+    def invalidate(self):
+        with self._lock:
+            self._catalog = None
+            self._checked_at = None
+
+    def stats(self):
+        with self._lock:
+            catalog = self._catalog
+            return {
+                "entries": catalog.size if catalog else 0,
+                "bytes": len(catalog.body) if catalog else 0,
+                "hits": self.hits,
+                "revalidations": self.revalidations,
+                "misses": self.misses,
+            }
+
+# Keyed by database rather than engine: the sync engine that handles writes and
+# the async engine that serves the list must share one cache.
+_caches = {}
+_caches_lock = threading.Lock()
+
+def _database_key(engine):
+    url = engine.url
+    return (url.get_backend_name(), url.host, url.port, url.database)
+
+def get_catalog_cache(db: Session) -> CatalogCache:
+    key = _database_key(db.get_bind())
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = CatalogCache(CATALOG_TTL)
+    return cache
+
+def all_stats() -> list[dict]:
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in caches]
+
+def _invalidate_on_ddl(target, connection, **kw):
+    cache = _caches.get(_database_key(connection.engine))
+    if cache is not None:
+        cache.invalidate()
+
+event.listen(models.Competencia.__table__, "after_create", _invalidate_on_ddl)
+event.listen(models.Competencia.__table__, "after_drop", _invalidate_on_ddl)
@@ -1,8 +1,14 @@
+from collections import defaultdict
+
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
+from app.cache.response import invalidate
 from app.model import models
+from app.vagas.index import get_index
 from . import schemas
+from .cache import get_catalog_cache
 
 def create_competencia(db: Session, competencia: schemas.CompetenciaCreate):
     existing = db.query(models.Competencia).filter(models.Competencia.nome == competencia.nome).first()
@@ -12,6 +18,8 @@ def create_competencia(db: Session, competencia: schemas.CompetenciaCreate):
     db_competencia = models.Competencia(nome=competencia.nome)
     db.add(db_competencia)
     db.commit()
+    get_catalog_cache(db).invalidate()
+    invalidate("vagas")
     db.refresh(db_competencia)
     return db_competencia
 
@@ -21,9 +29,46 @@ def delete_competencia(db: Session, competencia_id: int):
     if not db_competencia:
         return None
 
+    # The vagas that list it lose a competência, so their ETags have to move
+    db.execute(
+        update(models.Vagaemprego)
+        .where(models.Vagaemprego.id.in_(
+            select(models.vaga_competencia.c.vaga_id).where(models.vaga_competencia.c.competencia_id == competencia_id)
+        ))
+        .values(version=models.Vagaemprego.version + 1)
+        .execution_options(synchronize_session=False)
+    )
     db.delete(db_competencia)
     db.commit()
+    get_catalog_cache(db).invalidate()
+    invalidate("vagas")
+    get_index(db).remove_competencia(competencia_id)
     return db_competencia
 
+def get_competencias_version(db: Session):
+    return db.execute(
+        select(models.collection_versions.c.version).where(models.collection_versions.c.nome == "competencias")
+    ).scalar()
+
 def get_competencias(db: Session):
-    return db.query(models.Competencia).all()
\ No newline at end of file
+    return db.query(models.Competencia).all()
+
+def get_competencias_records(db: Session, owner_column, owner_ids) -> dict[int, list[dict]]:
+    # Competencia records per owner, read from an association column such as
+    # vaga_competencia.c.vaga_id in one query
+    competencias = defaultdict(list)
+    if not owner_ids:
+        return competencias
+    association = owner_column.table
+    rows = db.execute(
+        select(owner_column, models.Competencia.nome, models.Competencia.id)
+        .join(models.Competencia, models.Competencia.id == association.c.competencia_id)
+        .where(owner_column.in_(owner_ids))
+        .order_by(owner_column, models.Competencia.id)
+    )
+    for owner_id, nome, competencia_id in rows:
+        competencias[owner_id].append({"nome": nome, "id": competencia_id})
+    return competencias
+
+def get_competencias_catalog(db: Session):
+    return get_catalog_cache(db).get(db, get_competencias_version, get_competencias)
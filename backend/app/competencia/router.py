@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import Optional
+from app import compression
+from app.responses import ORJSONResponse
+from app.database import get_db, get_async_db
 from . import schemas, functions
+from app.dependencies import etag
 from app.dependencies.auth import get_current_user
 
 router = APIRouter(prefix="/competencias", tags=["Competencias"])
@@ -18,5 +23,23 @@ def delete_competencia(competencia_id: int, db: Session = Depends(get_db), all_u
     return deleted_competencia
 
 @router.get("/", response_model=list[schemas.Competencia])
-def list_competencias(db: Session = Depends(get_db)):
-    return functions.get_competencias(db)
\ No newline at end of file
+async def list_competencias(
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # The catalog comes pre-serialized from the per-worker cache
+    catalog = await db.run_sync(functions.get_competencias_catalog)
+    if catalog.version is not None and etag.none_match(if_none_match, catalog.version):
+        return etag.not_modified(catalog.version, etag.COLLECTION_CACHE_CONTROL)
+
+    # Compressed once per catalog version and encoding, not on every request
+    encoding = compression.negotiate(accept_encoding)
+    tag = etag.make_etag(catalog.version) if catalog.version is not None else None
+    body, headers = compression.encoded(catalog.body, "application/json", encoding, catalog.compressed, tag)
+    response = ORJSONResponse(body)
+    if catalog.version is not None:
+        etag.set_headers(response, catalog.version, etag.COLLECTION_CACHE_CONTROL)
+    # After set_headers: a compressed body has its own ETag
+    response.headers.update(headers)
+    return response
\ No newline at end of file
@@ -1,10 +1,15 @@
+import json
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.competencia import functions as competencia_functions, schemas as competencia_schemas
-from app.database import Base, get_db
+from app.competencia.cache import CatalogCache
+from app.database import Base, get_db, get_async_db
 from app.main import app
+from app.model import models
 
 # Unit tests
 
@@ -42,6 +47,25 @@ def test_delete_empresa(db):
 
     assert db.query(competencia_functions.models.Competencia).filter_by(id=created_competencia.id).first() is None
 
+def test_delete_competencia_bumps_vaga_versions(db):
+    java = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Java"))
+    python = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Python"))
+    vagas = [
+        models.Vagaemprego(titulo=f"Vaga {i}", descricao="Vaga para testes", modalidade="Remoto",
+                           salario=1000, no_vagas=1, empresa_id=1)
+        for i in range(2)
+    ]
+    vagas[0].competencias = [java]
+    vagas[1].competencias = [python]
+    db.add_all(vagas)
+    db.commit()
+
+    competencia_functions.delete_competencia(db, java.id)
+
+    db.expire_all()
+    assert [vaga.version for vaga in vagas] == [2, 1]
+    assert vagas[0].competencias == []
+
 def test_get_competencias(db):
     competencia_data_1 = competencia_schemas.CompetenciaCreate(
         nome="Python avancado"
@@ -58,6 +82,41 @@ def test_get_competencias(db):
     assert "Python avancado" in comps
     assert "React" in comps
 
+def test_competencias_catalog_cache(db):
+    competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Python"))
+
+    first = competencia_functions.get_competencias_catalog(db)
+    assert json.loads(first.body) == [{"nome": "Python", "id": 1}]
+
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine_unit, "before_cursor_execute", count)
+    try:
+        assert competencia_functions.get_competencias_catalog(db) is first
+    finally:
+        event.remove(engine_unit, "before_cursor_execute", count)
+    assert statements == []
+
+    competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Go"))
+    second = competencia_functions.get_competencias_catalog(db)
+    assert [competencia["nome"] for competencia in json.loads(second.body)] == ["Python", "Go"]
+    assert second.version > first.version
+
+def test_competencias_catalog_cache_revalidates_after_ttl(db):
+    competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Python"))
+    cache = CatalogCache(ttl=0)
+    load = lambda: cache.get(db, competencia_functions.get_competencias_version, competencia_functions.get_competencias)
+
+    first = load()
+    assert load() is first
+    # Another worker's write: no local invalidation, only the version moves
+    db.execute(models.Competencia.__table__.insert().values(nome="Go"))
+    db.commit()
+    latest = load()
+    assert json.loads(latest.body)[-1]["nome"] == "Go"
+    assert cache.stats() == {"entries": 2, "bytes": len(latest.body), "hits": 0, "revalidations": 1, "misses": 2}
+
 # Integration tests
 
 SQLALCHEMY_DATABASE_URL_INTEGRATION = "sqlite:///./test_admin_integration.db"
@@ -73,6 +132,17 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# NullPool: TestClient may run each request on a fresh event loop
+SQLALCHEMY_ASYNC_DATABASE_URL_INTEGRATION = "sqlite+aiosqlite:///./test_admin_integration.db"
+async_engine_integration = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL_INTEGRATION, poolclass=NullPool)
+TestingAsyncSessionLocal_integration = async_sessionmaker(async_engine_integration, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal_integration() as db:
+        yield db
+
+app.dependency_overrides[get_async_db] = override_get_async_db
+
 @pytest.fixture(scope="function", autouse=True)
 def setup_and_teardown_db():
     Base.metadata.create_all(bind=engine_integration)
@@ -131,4 +201,26 @@ def test_list_competencias_endpoint():
 
     names = [competencia["nome"] for competencia in competencias]
     assert "NodeJS" in names
-    assert "Rust intermedio" in names
\ No newline at end of file
+    assert "Rust intermedio" in names
+def test_list_competencias_conditional_get():
+    db = TestingSessionLocal_integration()
+    competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="NodeJS"))
+
+    response = client.get("/competencias/")
+    assert response.status_code == 200
+    assert "s-maxage" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+
+    not_modified = client.get("/competencias/", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.headers["Cache-Control"] == response.headers["Cache-Control"]
+    assert not_modified.content == b""
+
+    competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Rust"))
+    db.close()
+
+    changed = client.get("/competencias/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [competencia["nome"] for competencia in changed.json()] == ["NodeJS", "Rust"]
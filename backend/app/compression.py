@@ -0,0 +1,183 @@
+import gzip
+import os
+import zlib
+from typing import Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+
+# Bodies smaller than this go out as they are: the compressed form would save
+# little and the CPU is better spent elsewhere
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+# In order of preference when the client accepts several with the same q
+ENCODINGS = ("br", "gzip")
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    # The preferred encoding the client accepts, or None for identity
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip().lower()] = q
+
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def compressible(content_type: Optional[str], size: int) -> bool:
+    return size >= COMPRESSION_MIN_SIZE and compressible_type(content_type)
+
+def compressible_type(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+            self._process = self._compressor.process
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+            self._process = self._compressor.compress
+
+    def chunk(self, data: bytes) -> bytes:
+        # Flushed per chunk so streamed exports reach the client as they are produced
+        return self._process(data) + self._flush()
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    # Each encoding is a different representation, so a strong ETag can't be
+    # shared with the identity body: "7" becomes "7-gzip". Weak ETags already
+    # only promise equivalent content.
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+def decoded_etag(etag: str) -> str:
+    # The identity ETag behind an encoded one, for revalidating either form
+    for encoding in ENCODINGS:
+        if etag.endswith(f'-{encoding}"'):
+            return etag[:-len(encoding) - 2] + '"'
+    return etag
+
+def encoded(body: bytes, content_type: Optional[str], encoding: Optional[str], compress_body, etag: Optional[str] = None):
+    # For bodies served from a cache: the form to send and its extra headers.
+    # compress_body returns the cached compressed form, compressing it once.
+    if encoding is None or not compressible(content_type, len(body)):
+        return body, {}
+    headers = {"content-encoding": encoding, "vary": "Accept-Encoding"}
+    if etag:
+        headers["etag"] = encoded_etag(etag, encoding)
+    return compress_body(encoding), headers
+
+def vary_on_encoding(headers: MutableHeaders):
+    if "accept-encoding" not in headers.get("vary", "").lower():
+        headers.add_vary_header("Accept-Encoding")
+
+def encoded_headers(headers: MutableHeaders, encoding: str, length: Optional[int]):
+    headers["Content-Encoding"] = encoding
+    if "etag" in headers:
+        headers["ETag"] = encoded_etag(headers["etag"], encoding)
+    vary_on_encoding(headers)
+    if length is None:
+        del headers["Content-Length"]
+    else:
+        headers["Content-Length"] = str(length)
+
+class CompressionMiddleware:
+    # Compresses bodies the app sent uncompressed; responses that already set
+    # Content-Encoding (precompressed cache hits) pass through untouched.
+    # Every compressible response, compressed or not, says it varies by
+    # Accept-Encoding so shared caches never hand one client another's form;
+    # so do 304s confirming an encoded ETag.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding"))
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if message["status"] == 304:
+                    tag = encoded_etag(headers["etag"], encoding) if encoding and "etag" in headers else None
+                    if tag and tag in request_headers.get("if-none-match", ""):
+                        # Revalidated with the encoded ETag: confirm that one
+                        headers["ETag"] = tag
+                    if "etag" in headers and decoded_etag(headers["etag"]) != headers["etag"]:
+                        # Stands in for a compressed body, which varied like this
+                        vary_on_encoding(headers)
+                    passthrough = True
+                    await send(message)
+                elif not compressible_type(headers.get("content-type")):
+                    passthrough = True
+                    await send(message)
+                else:
+                    vary_on_encoding(headers)
+                    if encoding is None or "content-encoding" in headers:
+                        passthrough = True
+                        await send(message)
+                    else:
+                        start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            headers = MutableHeaders(scope=start)
+            if compressor is None and not more_body:
+                # Whole body in one message: compress only when it is big enough
+                if len(body) >= COMPRESSION_MIN_SIZE:
+                    body = compress(body, encoding)
+                    encoded_headers(headers, encoding, len(body))
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            if compressor is None:
+                compressor = _StreamCompressor(encoding)
+                encoded_headers(headers, encoding, None)
+                await send(start)
+            data = compressor.chunk(body)
+            if not more_body:
+                data += compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
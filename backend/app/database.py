@@ -1,6 +1,10 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, declarative_base, make_transient_to_detached
+from app.dependencies import etag
+from app.monitoring.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 
 DB_USER = os.getenv("POSTGRES_USER", "myuser")
 DB_PASSWORD = os.getenv("POSTGRES_PASSWORD", "mypassword")
@@ -8,16 +12,111 @@ DB_NAME = os.getenv("POSTGRES_DB", "mydb")
 DB_HOST = os.getenv("DB_HOST", "db")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DATABASE_URL = os.getenv("DATABASE_URL", f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
 
-engine = create_engine(DATABASE_URL)
+connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+
+# Every worker process opens its own sync and async pools, so by default the
+# server's connection budget is split evenly across WEB_CONCURRENCY workers x 2
+# engines, half kept open and half as overflow. Each setting can be overridden.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "90"))
+_per_engine = max(2, DB_MAX_CONNECTIONS // (WEB_CONCURRENCY * 2))
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(_per_engine // 2)))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", str(_per_engine - _per_engine // 2)))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+def pool_options(url: str, poolclass) -> dict:
+    # In-memory SQLite is a single connection, not a queue pool
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **pool_options(DATABASE_URL, InstrumentedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def async_database_url(url: str) -> str:
+    url = make_url(url)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name())
+    if drivername is None:
+        raise RuntimeError(
+            f"No async driver known for the {url.get_backend_name()!r} backend; "
+            "set ASYNC_DATABASE_URL to the same database through an async driver"
+        )
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+# Same database through an async driver, for routes that should not hold a
+# threadpool thread while they wait on queries
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool))
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+def insert_ignore(db, table):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table).on_conflict_do_nothing()
+
+def update_returning(db, model, id: int, values: dict, versions: list[int] = None):
+    # One UPDATE ... RETURNING round trip instead of SELECT, UPDATE and refresh;
+    # with nothing to change it is just the SELECT. Versioned models get their
+    # version bumped, and versions (from If-Match) makes the write conditional.
+    table = model.__table__
+    filters = [table.c.id == id]
+    if versions is not None:
+        filters.append(table.c.version.in_(versions))
+    if values:
+        if "version" in table.c:
+            values = {**values, "version": table.c.version + 1}
+        statement = update(table).where(*filters).values(**values).returning(*table.c)
+    else:
+        statement = select(table).where(*filters)
+    row = db.execute(statement).first()
+    db.commit()
+
+    if row is None:
+        if versions is not None and db.execute(select(table.c.id).where(table.c.id == id)).first():
+            raise etag.precondition_failed()
+        return None
+    # The returned row becomes the committed state, so reading it doesn't reload
+    instance = model(**row._mapping)
+    make_transient_to_detached(instance)
+    return db.merge(instance, load=False)
+
+def schema_columns(model, schema) -> list:
+    # The columns behind a response schema's flat fields, in field order, so
+    # the records serialize with the same keys and order as the schema
+    return [model.__table__.c[name] for name in schema.model_fields if name in model.__table__.c]
+
+def fetch_records(db, statement) -> list[dict]:
+    # Plain dicts straight from the cursor: no ORM instances, identity map or
+    # schema validation on the way to the response body
+    return [dict(row) for row in db.execute(statement).mappings()]
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
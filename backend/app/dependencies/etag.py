@@ -0,0 +1,52 @@
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException, Response
+
+from app.compression import decoded_etag
+
+# Polled collections: browsers always revalidate, shared caches may serve a copy
+# for a few seconds and keep serving it while they revalidate in the background
+COLLECTION_CACHE_CONTROL = os.getenv("COLLECTION_CACHE_CONTROL", "public, max-age=0, s-maxage=5, stale-while-revalidate=30")
+
+def make_etag(version: int) -> str:
+    return f'"{version}"'
+
+def _tags(header: str) -> list[str]:
+    # Compressed responses carry "<version>-<encoding>" tags for the same version
+    return [decoded_etag(tag.strip()) for tag in header.split(",") if tag.strip()]
+
+def if_match(if_match: Optional[str] = Header(None)) -> Optional[list[int]]:
+    # The versions a PUT/DELETE may overwrite; None when the request is unconditional.
+    # If-Match uses strong comparison, so weak tags never match.
+    if if_match is None:
+        return None
+    tags = _tags(if_match)
+    if "*" in tags:
+        return None
+    return [int(tag[1:-1]) for tag in tags if tag[:1] == tag[-1:] == '"' and tag[1:-1].isdigit()]
+
+def none_match(if_none_match: Optional[str], version: int) -> bool:
+    # If-None-Match uses weak comparison
+    if if_none_match is None:
+        return False
+    tags = _tags(if_none_match)
+    return "*" in tags or make_etag(version) in (tag.removeprefix("W/") for tag in tags)
+
+def not_modified(version: int, cache_control: str = None) -> Response:
+    headers = {"ETag": make_etag(version)}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
+def set_headers(response: Response, version: int, cache_control: str = None):
+    response.headers["ETag"] = make_etag(version)
+    if cache_control:
+        response.headers["Cache-Control"] = cache_control
+
+def precondition_failed() -> HTTPException:
+    return HTTPException(status_code=412, detail="Recurso modificado por outra requisição")
+
+def check_version(version: int, versions: Optional[list[int]]):
+    if versions is not None and version not in versions:
+        raise precondition_failed()
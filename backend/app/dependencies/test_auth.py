@@ -0,0 +1,59 @@
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from jose import jwt
+from app.dependencies import auth
+
+def make_token(expires_in: timedelta, **claims):
+    payload = {"sub": "maria@user.com", "role": "user", "id": 1, **claims}
+    payload["exp"] = datetime.now(timezone.utc) + expires_in
+    return jwt.encode(payload, auth.SECRET_KEY, algorithm=auth.ALGORITHM)
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    auth.token_cache.clear()
+    yield
+    auth.token_cache.clear()
+
+def test_get_current_user_caches_verified_claims():
+    token = make_token(timedelta(minutes=5))
+
+    first = auth.get_current_user(token)
+    second = auth.get_current_user(token)
+
+    assert first == second == {"email": "maria@user.com", "role": "user", "id": 1}
+    assert auth.token_cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+def test_get_current_user_rejects_expired_and_invalid_tokens():
+    expired = make_token(timedelta(minutes=-5))
+    with pytest.raises(HTTPException) as exc_info:
+        auth.get_current_user(expired)
+    assert exc_info.value.detail == "Invalid or expired token"
+
+    with pytest.raises(HTTPException) as exc_info:
+        auth.get_current_user("not-a-token")
+    assert exc_info.value.status_code == 401
+
+    missing_role = make_token(timedelta(minutes=5), role=None)
+    with pytest.raises(HTTPException) as exc_info:
+        auth.get_current_user(missing_role)
+    assert exc_info.value.detail == "Invalid token structure"
+
+    assert auth.token_cache.stats()["size"] == 0
+
+def test_token_cache_expiry_and_eviction():
+    cache = auth.TokenCache(maxsize=2, max_ttl=60)
+    user = {"email": "maria@user.com", "role": "user", "id": 1}
+
+    cache.set("expired", user, exp=time.time() - 1)
+    assert cache.get("expired") is None
+
+    cache.set("a", user, exp=time.time() + 60)
+    cache.set("b", user)
+    cache.get("a")
+    cache.set("c", user)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == user
+    assert cache.get("c") == user
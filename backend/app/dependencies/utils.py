@@ -1,4 +1,8 @@
+import asyncio
+import os
+import time
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor
 from jose import jwt
 from datetime import datetime, timedelta
 
@@ -6,9 +10,44 @@ SECRET_KEY = "SHARED_SECRET_KEY_123"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
+# Work factor for new hashes: a number of rounds, or "auto" to pick the highest
+# cost that stays under BCRYPT_TARGET_MS on this machine.
+BCRYPT_ROUNDS = os.getenv("BCRYPT_ROUNDS", "12")
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+
+# bcrypt releases the GIL, so a small dedicated pool hashes in parallel without
+# occupying the request threadpool; its size bounds the CPU spent on hashing.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_calibrated_rounds = None
+
+def _calibrate_rounds() -> int:
+    sample = b"calibration-password"
+    rounds = BCRYPT_MIN_ROUNDS
+    while rounds < BCRYPT_MAX_ROUNDS:
+        start = time.perf_counter()
+        bcrypt.hashpw(sample, bcrypt.gensalt(rounds))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        # Each extra round doubles the cost
+        if elapsed_ms * 2 > BCRYPT_TARGET_MS:
+            break
+        rounds += 1
+    return rounds
+
+def get_bcrypt_rounds() -> int:
+    global _calibrated_rounds
+    if BCRYPT_ROUNDS != "auto":
+        return int(BCRYPT_ROUNDS)
+    if _calibrated_rounds is None:
+        _calibrated_rounds = _calibrate_rounds()
+    return _calibrated_rounds
+
 def hash_password(password: str) -> str:
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(get_bcrypt_rounds())
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode()
 
@@ -17,6 +56,10 @@ def verify_password(plain: str, hashed: str) -> bool:
     hashed_bytes = hashed.encode("utf-8")
     return bcrypt.checkpw(plain_bytes, hashed_bytes)
 
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, hash_password, password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -1,5 +1,9 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.cache.response import invalidate
+from app.database import fetch_records, schema_columns, update_returning
+from app.dependencies.etag import check_version
 from app.model import models
 from . import schemas
 
@@ -15,44 +19,47 @@ def create_empresa(db: Session, empresa: schemas.EmpresaCreate):
     )
     db.add(db_empresa)
     db.commit()
+    invalidate("empresas")
     db.refresh(db_empresa)
     return db_empresa
 
-def update_empresa(db: Session, empresa_id: int, empresa_update: schemas.EmpresaUpdate):
-    db_empresa = db.query(models.Empresa).filter(models.Empresa.id == empresa_id).first()
+def update_empresa(db: Session, empresa_id: int, empresa_update: schemas.EmpresaUpdate, versions: list[int] = None):
+    updated = update_returning(db, models.Empresa, empresa_id, empresa_update.model_dump(exclude_none=True), versions)
+    if updated:
+        invalidate("empresas")
+    return updated
+
+def delete_empresa(db: Session, empresa_id: int, versions: list[int] = None):
+    query = db.query(models.Empresa).filter(models.Empresa.id == empresa_id)
+    if versions is not None:
+        query = query.with_for_update()
+    db_empresa = query.first()
 
     if not db_empresa:
         return None
 
-    if empresa_update.nome is not None:
-        db_empresa.nome = empresa_update.nome
-    if empresa_update.descricao is not None:
-        db_empresa.descricao = empresa_update.descricao
-    if empresa_update.cidade is not None:
-        db_empresa.cidade = empresa_update.cidade
-    if empresa_update.cep is not None:
-        db_empresa.cep = empresa_update.cep
-    if empresa_update.no_empregados is not None:
-        db_empresa.no_empregados = empresa_update.no_empregados
-    if empresa_update.anos_func is not None:
-        db_empresa.anos_func = empresa_update.anos_func
-
+    check_version(db_empresa.version, versions)
+    db.delete(db_empresa)
     db.commit()
-    db.refresh(db_empresa)
+    invalidate("empresas")
     return db_empresa
 
-def delete_empresa(db: Session, empresa_id: int):
-    db_empresa = db.query(models.Empresa).filter(models.Empresa.id == empresa_id).first()
+def get_empresa(db: Session, empresa_id: int):
+    return db.query(models.Empresa).filter(models.Empresa.id == empresa_id).first()
 
-    if not db_empresa:
-        return None
+def get_empresa_version(db: Session, empresa_id: int):
+    return db.execute(select(models.Empresa.version).where(models.Empresa.id == empresa_id)).scalar()
 
-    db.delete(db_empresa)
-    db.commit()
-    return db_empresa
+def get_empresas_version(db: Session):
+    return db.execute(
+        select(models.collection_versions.c.version).where(models.collection_versions.c.nome == "empresas")
+    ).scalar()
 
 def get_empresas(db: Session):
     return db.query(models.Empresa).all()
 
+def get_empresas_records(db: Session):
+    return fetch_records(db, select(*schema_columns(models.Empresa, schemas.Empresa)))
+
 def get_empresas_by_admin(db: Session, admin_id: int):
     return db.query(models.Empresa).filter(models.Empresa.admin_id == admin_id).all()
\ No newline at end of file
@@ -1,34 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import Optional
+from app.cache.response import RESPONSE_CACHE_TTL, cached
+from app.responses import ORJSONResponse
+from app.database import get_db, get_async_db
 from . import schemas, functions
+from app.dependencies import etag
 from app.dependencies.auth import get_current_admin
 
 router = APIRouter(prefix="/empresas", tags=["Empresas"])
 
+def _get_empresa(db: Session, empresa_id: int):
+    empresa = functions.get_empresa(db, empresa_id)
+    if not empresa:
+        return None
+    return schemas.Empresa.model_validate(empresa, from_attributes=True), empresa.version
+
 @router.post("/", response_model=schemas.Empresa)
 def create_empresa(empresa: schemas.EmpresaCreate, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
     return functions.create_empresa(db, empresa)
 
 @router.put("/{empresa_id}", response_model=schemas.Empresa)
-def update_empresa(empresa_id: int, empresa_update: schemas.EmpresaUpdate, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
-    updated = functions.update_empresa(db, empresa_id, empresa_update)
+def update_empresa(
+    empresa_id: int,
+    empresa_update: schemas.EmpresaUpdate,
+    response: Response,
+    versions: Optional[list[int]] = Depends(etag.if_match),
+    db: Session = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    updated = functions.update_empresa(db, empresa_id, empresa_update, versions)
     if not updated:
         raise HTTPException(status_code=404, detail="Empresa não encontrada")
+    etag.set_headers(response, updated.version)
     return updated
 
 @router.delete("/{empresa_id}", response_model=schemas.Empresa)
-def delete_empresa(empresa_id: int, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
-    deleted = functions.delete_empresa(db, empresa_id)
+def delete_empresa(
+    empresa_id: int,
+    versions: Optional[list[int]] = Depends(etag.if_match),
+    db: Session = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    deleted = functions.delete_empresa(db, empresa_id, versions)
     if not deleted:
         raise HTTPException(status_code=404, detail="Empresa não encontrada")
     return deleted
 
 @router.get("/", response_model=list[schemas.Empresa])
-def list_empresas(db: Session = Depends(get_db)):
-    return functions.get_empresas(db)
+@cached(ttl=RESPONSE_CACHE_TTL, tags=("empresas",))
+async def list_empresas(if_none_match: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    version = await db.run_sync(functions.get_empresas_version)
+    if version is not None and etag.none_match(if_none_match, version):
+        return etag.not_modified(version, etag.COLLECTION_CACHE_CONTROL)
+
+    empresas = await db.run_sync(functions.get_empresas_records)
+    response = ORJSONResponse(empresas)
+    if version is not None:
+        etag.set_headers(response, version, etag.COLLECTION_CACHE_CONTROL)
+    return response
 
 @router.get("/admin", response_model=list[schemas.Empresa])
 def get_empresas_for_admin(db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
     empresas = functions.get_empresas_by_admin(db, current_admin["id"])
-    return empresas
\ No newline at end of file
+    return empresas
+
+# Declared last so the static GET routes above take precedence over /{empresa_id}
+@router.get("/{empresa_id}", response_model=schemas.Empresa)
+async def get_empresa(
+    empresa_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if if_none_match is not None:
+        version = await db.run_sync(functions.get_empresa_version, empresa_id)
+        if version is not None and etag.none_match(if_none_match, version):
+            return etag.not_modified(version)
+
+    found = await db.run_sync(_get_empresa, empresa_id)
+    if not found:
+        raise HTTPException(status_code=404, detail="Empresa não encontrada")
+    empresa, version = found
+    etag.set_headers(response, version)
+    return empresa
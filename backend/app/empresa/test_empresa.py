@@ -1,10 +1,14 @@
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.empresa import functions as empresa_functions, schemas as empresa_schemas
 from app.admin import functions as admin_functions, schemas as admin_schemas
-from app.database import Base, get_db
+from app.database import Base, get_db, get_async_db
+from app.model import models
 from app.main import app
 
 # Unit tests
@@ -162,6 +166,70 @@ def test_get_empresas_by_admin(db):
     assert fetched.nome == "EmpresaCorp"
     assert fetched.cep == "12345678-12"
 
+def test_update_empresa_single_statement(db):
+    admin = admin_functions.create_admin(db, admin_schemas.AdminCreate(
+        nome="Marcus",
+        cpf="123.456.789-00",
+        email="Marcus@admin.com",
+        telefone="9999-9999",
+        password="adminpasstest"
+    ))
+    empresa = empresa_functions.create_empresa(db, empresa_schemas.EmpresaCreate(
+        nome="EmpresaCorp",
+        descricao="Empresa para testes",
+        cidade="Brasilia",
+        cep="12345678-12",
+        no_empregados=15,
+        anos_func=3,
+        admin_id=admin.id
+    ))
+
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine_unit, "before_cursor_execute", count)
+    try:
+        updated = empresa_functions.update_empresa(db, empresa.id, empresa_schemas.EmpresaUpdate(cidade="Recife", anos_func=4))
+        assert (updated.nome, updated.cidade, updated.anos_func) == ("EmpresaCorp", "Recife", 4)
+        missing = empresa_functions.update_empresa(db, 999, empresa_schemas.EmpresaUpdate(cidade="Recife"))
+    finally:
+        event.remove(engine_unit, "before_cursor_execute", count)
+
+    assert len(statements) == 2
+    assert all(statement.startswith("UPDATE") for statement in statements)
+    assert missing is None
+
+    db.expire_all()
+    assert db.get(models.Empresa, empresa.id).cidade == "Recife"
+
+def test_update_empresa_stale_version(db):
+    admin = admin_functions.create_admin(db, admin_schemas.AdminCreate(
+        nome="Marcus",
+        cpf="123.456.789-00",
+        email="Marcus@admin.com",
+        telefone="9999-9999",
+        password="adminpasstest"
+    ))
+    empresa = empresa_functions.create_empresa(db, empresa_schemas.EmpresaCreate(
+        nome="EmpresaCorp",
+        descricao="Empresa para testes",
+        cidade="Brasilia",
+        cep="12345678-12",
+        no_empregados=15,
+        anos_func=3,
+        admin_id=admin.id
+    ))
+
+    first = empresa_functions.update_empresa(db, empresa.id, empresa_schemas.EmpresaUpdate(cidade="Recife"), versions=[empresa.version])
+    assert first.version == 2
+
+    with pytest.raises(HTTPException) as stale:
+        empresa_functions.update_empresa(db, empresa.id, empresa_schemas.EmpresaUpdate(cidade="Natal"), versions=[1])
+    assert stale.value.status_code == 412
+
+    db.expire_all()
+    assert empresa_functions.get_empresa(db, empresa.id).cidade == "Recife"
+
 # Integration tests
 
 SQLALCHEMY_DATABASE_URL_INTEGRATION = "sqlite:///./test_admin_integration.db"
@@ -177,6 +245,17 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# NullPool: TestClient may run each request on a fresh event loop
+SQLALCHEMY_ASYNC_DATABASE_URL_INTEGRATION = "sqlite+aiosqlite:///./test_admin_integration.db"
+async_engine_integration = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL_INTEGRATION, poolclass=NullPool)
+TestingAsyncSessionLocal_integration = async_sessionmaker(async_engine_integration, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal_integration() as db:
+        yield db
+
+app.dependency_overrides[get_async_db] = override_get_async_db
+
 @pytest.fixture(scope="function", autouse=True)
 def setup_and_teardown_db():
     Base.metadata.create_all(bind=engine_integration)
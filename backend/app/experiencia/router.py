@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from app.cache.response import RESPONSE_CACHE_TTL, cached
 from app.database import get_db
 from . import schemas, functions
 from app.dependencies.auth import get_current_regular_user, get_current_user
@@ -26,6 +27,7 @@ def delete_experiencia(experiencia_id: int, db: Session = Depends(get_db), curre
     return deleted
 
 @router.get("/user/{user_id}", response_model=list[schemas.Experiencia])
+@cached(ttl=RESPONSE_CACHE_TTL, tags=("experiencias:{user_id}",))
 def list_experiencias(user_id: int, db: Session = Depends(get_db)):
     experiencias = functions.get_experiencias_by_user(db, user_id)
-    return experiencias
\ No newline at end of file
+    return [schemas.Experiencia.model_validate(experiencia, from_attributes=True) for experiencia in experiencias]
\ No newline at end of file
@@ -1,8 +1,9 @@
 from fastapi import FastAPI, Depends, HTTPException
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 
-from app.database import engine, Base
+from app.database import engine, async_engine, Base
 from app.model import models
 from app.admin.router import router as admin_router
 from app.user.router import router as user_router
@@ -10,8 +11,15 @@ from app.empresa.router import router as empresa_router
 from app.vagas.router import router as vagas_router
 from app.experiencia.router import router as experiencias_router
 from app.competencia.router import router as competencias_router
+from app.compression import CompressionMiddleware
+from app.monitoring import sql as sql_monitoring
+from app.monitoring.middleware import MetricsMiddleware, QueryTimingMiddleware
+from app.monitoring.router import router as monitoring_router
+from app.responses import ORJSONResponse
 
-app = FastAPI()
+# Wrapped in Default so routes with a response_model keep FastAPI's own
+# Pydantic serialization; everything else is rendered by orjson
+app = FastAPI(default_response_class=Default(ORJSONResponse))
 
 origins = [
     "http://localhost:3000",
@@ -23,8 +31,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(QueryTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+sql_monitoring.install(engine)
+sql_monitoring.install(async_engine.sync_engine)
+
 @app.get("/")
 def read_root():
     return {"message": "Hello from FastAPI!"}
@@ -38,4 +54,5 @@ app.include_router(user_router)
 app.include_router(empresa_router)
 app.include_router(vagas_router)
 app.include_router(experiencias_router)
-app.include_router(competencias_router)
\ No newline at end of file
+app.include_router(competencias_router)
+app.include_router(monitoring_router)
\ No newline at end of file
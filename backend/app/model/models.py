@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, Float, String, ForeignKey
+from sqlalchemy import Table, Column, Integer, Float, String, ForeignKey, Index, DDL, event, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -19,15 +19,53 @@ user_competencia = Table(
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id")),
     Column("competencia_id", Integer, ForeignKey("competencias.id")),
+    Index("uq_user_competencia_user_competencia", "user_id", "competencia_id", unique=True),
 )
 
+def _sqlite_index_missing(name: str):
+    # execute_if callable: the dedupe only runs while the index doesn't exist yet
+    def check(ddl, target, bind, **kw):
+        return bind.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"), {"name": name}
+        ).first() is None
+    return check
+
+def _unique_pair_index(table: str, index: str, left: str, right: str):
+    # create_all skips existing tables, so databases created before the unique
+    # index get their duplicate pairs removed and the index added here.
+    event.listen(Base.metadata, "after_create", DDL(f"""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = '{index}') THEN
+                DELETE FROM {table} a USING {table} b
+                 WHERE a.ctid < b.ctid AND a.{left} = b.{left} AND a.{right} = b.{right};
+                CREATE UNIQUE INDEX {index} ON {table} ({left}, {right});
+            END IF;
+        END $$
+    """).execute_if(dialect="postgresql"))
+
+    event.listen(Base.metadata, "after_create", DDL(f"""
+        DELETE FROM {table} WHERE rowid NOT IN (
+            SELECT min(rowid) FROM {table} GROUP BY {left}, {right}
+        )
+    """).execute_if(dialect="sqlite", callable_=_sqlite_index_missing(index)))
+    event.listen(Base.metadata, "after_create", DDL(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {index} ON {table} ({left}, {right})"
+    ).execute_if(dialect="sqlite"))
+
+_unique_pair_index("user_competencia", "uq_user_competencia_user_competencia", "user_id", "competencia_id")
+
 vaga_competencia = Table(
     "vaga_competencia",
     Base.metadata,
     Column("vaga_id", Integer, ForeignKey("vaga_emprego.id")),
     Column("competencia_id", Integer, ForeignKey("competencias.id")),
+    Index("ix_vaga_competencia_competencia_vaga", "competencia_id", "vaga_id"),
+    Index("uq_vaga_competencia_vaga_competencia", "vaga_id", "competencia_id", unique=True),
 )
 
+_unique_pair_index("vaga_competencia", "uq_vaga_competencia_vaga_competencia", "vaga_id", "competencia_id")
+
 class Competencia(Base):
     __tablename__ = "competencias"
 
@@ -70,6 +108,7 @@ class Empresa(Base):
     no_empregados = Column(Integer, unique=False, index=True, nullable=False)
     anos_func = Column(Integer, unique=False, index=True, nullable=False)
     admin_id = Column(Integer, ForeignKey("admins.id"), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     admin = relationship("Admin", back_populates="empresas")
 
@@ -84,7 +123,9 @@ class Vagaemprego(Base):
     modalidade = Column(String, unique=False, index=True, nullable=False)
     salario = Column(Float, unique=False, index=True, nullable=False)
     no_vagas = Column(Integer, unique=False, index=True, nullable=False)
+    no_candidatos = Column(Integer, nullable=False, default=0, server_default="0")
     empresa_id = Column(Integer, ForeignKey("empresas.id"), nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     empresa = relationship("Empresa", back_populates="vagas")
 
@@ -96,6 +137,64 @@ class Vagaemprego(Base):
 
     competencias = relationship("Competencia", secondary=vaga_competencia, back_populates="vagas")
 
+# Existing Postgres databases get no_candidatos here, backfilled once from the
+# applications already made so the application cap holds from the start.
+# Runs after every table exists, so user_vaga_association is there to count.
+event.listen(Base.metadata, "after_create", DDL("""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'vaga_emprego' AND column_name = 'no_candidatos'
+        ) THEN
+            ALTER TABLE vaga_emprego ADD COLUMN no_candidatos integer NOT NULL DEFAULT 0;
+            UPDATE vaga_emprego SET no_candidatos = candidaturas.total
+            FROM (SELECT vaga_id, count(*) AS total FROM user_vaga_association GROUP BY vaga_id) AS candidaturas
+            WHERE candidaturas.vaga_id = vaga_emprego.id;
+        END IF;
+    END $$
+""").execute_if(dialect="postgresql"))
+
+# Optimistic concurrency: every change to an empresa or vaga bumps its version,
+# which the API exposes as the ETag. Existing Postgres databases get the column here.
+for table in ("empresas", "vaga_emprego"):
+    event.listen(Base.metadata, "after_create", DDL(
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1"
+    ).execute_if(dialect="postgresql"))
+
+# Full-text search over titulo/descricao. Postgres keeps a generated tsvector
+# column with a GIN index (added idempotently so existing databases pick it up);
+# SQLite uses an external-content FTS5 table kept in sync by triggers.
+for ddl in (
+    """ALTER TABLE vaga_emprego ADD COLUMN IF NOT EXISTS search_vector tsvector
+       GENERATED ALWAYS AS (
+           setweight(to_tsvector('portuguese', coalesce(titulo, '')), 'A') ||
+           setweight(to_tsvector('portuguese', coalesce(descricao, '')), 'B')
+       ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_vaga_emprego_search_vector ON vaga_emprego USING GIN (search_vector)",
+):
+    event.listen(Base.metadata, "after_create", DDL(ddl).execute_if(dialect="postgresql"))
+
+for ddl in (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS vaga_emprego_fts USING fts5(
+           titulo, descricao, content='vaga_emprego', content_rowid='id',
+           tokenize='unicode61 remove_diacritics 2'
+       )""",
+    """CREATE TRIGGER IF NOT EXISTS vaga_emprego_fts_ai AFTER INSERT ON vaga_emprego BEGIN
+           INSERT INTO vaga_emprego_fts(rowid, titulo, descricao) VALUES (new.id, new.titulo, new.descricao);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS vaga_emprego_fts_ad AFTER DELETE ON vaga_emprego BEGIN
+           INSERT INTO vaga_emprego_fts(vaga_emprego_fts, rowid, titulo, descricao) VALUES ('delete', old.id, old.titulo, old.descricao);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS vaga_emprego_fts_au AFTER UPDATE OF titulo, descricao ON vaga_emprego BEGIN
+           INSERT INTO vaga_emprego_fts(vaga_emprego_fts, rowid, titulo, descricao) VALUES ('delete', old.id, old.titulo, old.descricao);
+           INSERT INTO vaga_emprego_fts(rowid, titulo, descricao) VALUES (new.id, new.titulo, new.descricao);
+       END""",
+):
+    event.listen(Vagaemprego.__table__, "after_create", DDL(ddl).execute_if(dialect="sqlite"))
+
+event.listen(Vagaemprego.__table__, "after_drop", DDL("DROP TABLE IF EXISTS vaga_emprego_fts").execute_if(dialect="sqlite"))
+
 user_vaga_association = Table(
     "user_vaga_association",
     Base.metadata,
@@ -113,4 +212,90 @@ class Experiencia(Base):
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
-    user = relationship("User", back_populates="experiencias")
\ No newline at end of file
+    user = relationship("User", back_populates="experiencias")
+# One change counter per polled collection, bumped by triggers so Core writes
+# (bulk import, batch updates) count too. Vagas and empresas only count inserts,
+# deletes and version bumps, so no_candidatos churn doesn't invalidate the list;
+# competências are nested in vagas, so they bump both collections.
+collection_versions = Table(
+    "collection_versions",
+    Base.metadata,
+    Column("nome", String, primary_key=True),
+    Column("version", Integer, nullable=False, default=0, server_default="0"),
+)
+
+COLLECTION_TRIGGERS = {
+    "vaga_emprego": ("UPDATE OF version", ("vagas",)),
+    "empresas": ("UPDATE OF version", ("empresas",)),
+    "competencias": ("UPDATE", ("competencias", "vagas")),
+}
+
+event.listen(Base.metadata, "after_create", DDL(
+    "INSERT INTO collection_versions (nome, version) VALUES "
+    + ", ".join(f"('{nome}', 0)" for nome in ("vagas", "empresas", "competencias"))
+    + " ON CONFLICT DO NOTHING"
+))
+
+# Postgres: created once and left alone on later boots, so workers starting
+# together neither rewrite the function concurrently nor lock the tables to
+# drop and recreate triggers. Inserts and deletes bump once per statement, and
+# only when the statement touched rows (a bulk import bumps once, an empty
+# delete not at all); UPDATE OF can't have transition tables, so updates bump
+# per changed row and an UPDATE matching nothing doesn't bump.
+COLLECTION_TRIGGERS_LOCK = "PERFORM pg_advisory_xact_lock(hashtext('collection_version_triggers'));"
+
+event.listen(Base.metadata, "after_create", DDL(f"""
+    DO $$
+    BEGIN
+        {COLLECTION_TRIGGERS_LOCK}
+        IF NOT EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'bump_changed_collection_version') THEN
+            CREATE FUNCTION bump_changed_collection_version() RETURNS trigger AS $body$
+            BEGIN
+                IF TG_LEVEL = 'STATEMENT' THEN
+                    IF NOT EXISTS (SELECT 1 FROM changed) THEN
+                        RETURN NULL;
+                    END IF;
+                END IF;
+                UPDATE collection_versions SET version = version + 1 WHERE nome = ANY(TG_ARGV);
+                RETURN NULL;
+            END $body$ LANGUAGE plpgsql;
+        END IF;
+    END $$
+""").execute_if(dialect="postgresql"))
+
+for table, (on_update, nomes) in COLLECTION_TRIGGERS.items():
+    args = ", ".join(f"'{nome}'" for nome in nomes)
+    # Databases from before this replace their unconditional statement trigger
+    event.listen(Base.metadata, "after_create", DDL(f"""
+        DO $$
+        BEGIN
+            {COLLECTION_TRIGGERS_LOCK}
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = '{table}_collection_version_au') THEN
+                DROP TRIGGER IF EXISTS {table}_collection_version ON {table};
+                CREATE TRIGGER {table}_collection_version_ai AFTER INSERT ON {table}
+                    REFERENCING NEW TABLE AS changed
+                    FOR EACH STATEMENT EXECUTE FUNCTION bump_changed_collection_version({args});
+                CREATE TRIGGER {table}_collection_version_ad AFTER DELETE ON {table}
+                    REFERENCING OLD TABLE AS changed
+                    FOR EACH STATEMENT EXECUTE FUNCTION bump_changed_collection_version({args});
+                CREATE TRIGGER {table}_collection_version_au AFTER {on_update} ON {table}
+                    FOR EACH ROW EXECUTE FUNCTION bump_changed_collection_version({args});
+            END IF;
+        END $$
+    """).execute_if(dialect="postgresql"))
+
+    bump = f"UPDATE collection_versions SET version = version + 1 WHERE nome IN ({args})"
+    for suffix, operation in (("ai", "INSERT"), ("ad", "DELETE"), ("au", on_update)):
+        event.listen(Base.metadata, "after_create", DDL(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_collection_version_{suffix} AFTER {operation} ON {table} BEGIN {bump}; END"
+        ).execute_if(dialect="sqlite"))
+
+# The unconditional function the replaced triggers used
+event.listen(Base.metadata, "after_create", DDL("""
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'bump_collection_version') THEN
+            DROP FUNCTION bump_collection_version();
+        END IF;
+    END $$
+""").execute_if(dialect="postgresql"))
@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import time
+
+from starlette.routing import Match
+
+from . import sql
+from .metrics import http_requests_total, http_request_duration_seconds, http_requests_in_progress
+
+# Requests slower than this log every statement they ran
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_MAX_STATEMENTS = 50
+SLOW_REQUEST_STATEMENT_CHARS = 500
+
+logger = logging.getLogger("app.requests")
+
+def _route_template(scope):
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+
+    app = scope.get("app")
+    for candidate in getattr(app, "routes", ()):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return candidate.path
+    return "unmatched"
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_progress.dec(method)
+            route = _route_template(scope)
+            http_request_duration_seconds.observe(elapsed, method, route)
+            http_requests_total.inc(method, route, str(status_code))
+
+class QueryTimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = sql.start_tracking()
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                app_ms = (time.perf_counter() - start) * 1000
+                server_timing = (
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+                    f"app;dur={app_ms:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", server_timing.encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._log(scope, status_code, (time.perf_counter() - start) * 1000, stats)
+
+    def _log(self, scope, status_code, duration_ms, stats):
+        record = {
+            "method": scope["method"],
+            "route": _route_template(scope),
+            "status": status_code,
+            "duration_ms": round(duration_ms, 2),
+            "db_queries": stats.count,
+            "db_ms": round(stats.duration * 1000, 2),
+        }
+
+        repeated = stats.repeated_shapes()
+        if repeated:
+            record["n_plus_one"] = repeated
+
+        slow = duration_ms >= SLOW_REQUEST_MS
+        if slow:
+            record["statements"] = [
+                {"statement": statement[:SLOW_REQUEST_STATEMENT_CHARS], "ms": round(duration * 1000, 2)}
+                for statement, duration in stats.statements[:SLOW_REQUEST_MAX_STATEMENTS]
+            ]
+
+        level = logging.WARNING if repeated or slow else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,43 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .metrics import registry
+
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+
+db_pool_checkout_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    ("engine",), buckets=POOL_WAIT_BUCKETS,
+)
+db_pool_exhausted_total = registry.counter(
+    "db_pool_exhausted_total", "Checkouts that found every connection (including overflow) in use",
+    ("engine",),
+)
+db_pool_timeouts_total = registry.counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after pool_timeout", ("engine",),
+)
+
+class _InstrumentedPool:
+    label = "default"
+
+    def _do_get(self):
+        # max_overflow -1 means unbounded, so the pool can never be exhausted
+        if self._max_overflow >= 0 and self.checkedout() >= self.size() + self._max_overflow:
+            db_pool_exhausted_total.inc(self.label)
+
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            db_pool_timeouts_total.inc(self.label)
+            raise
+        finally:
+            db_pool_checkout_wait_seconds.observe(time.perf_counter() - start, self.label)
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    label = "sync"
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    label = "async"
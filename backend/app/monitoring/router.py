@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Response
+
+from app.database import engine, async_engine
+from app.competencia.cache import all_stats as competencia_cache_stats
+from app.dependencies.auth import token_cache
+from .metrics import registry, Gauge, Counter
+
+router = APIRouter(tags=["Monitoring"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@registry.collector
+def collect_db_pool():
+    pools = {"sync": engine.pool, "async": async_engine.pool}
+    metrics = []
+    for name, help, attr in (
+        ("db_pool_size", "Configured connection pool size", "size"),
+        ("db_pool_checked_out", "Connections currently checked out of the pool", "checkedout"),
+        ("db_pool_checked_in", "Idle connections in the pool", "checkedin"),
+        ("db_pool_overflow", "Connections opened beyond pool_size", "overflow"),
+    ):
+        gauge = Gauge(name, help, ("engine",))
+        for label, pool in pools.items():
+            if hasattr(pool, attr):
+                gauge.set(getattr(pool, attr)(), label)
+        metrics.append(gauge)
+    return metrics
+
+@registry.collector
+def collect_token_cache():
+    stats = token_cache.stats()
+    size = Gauge("auth_token_cache_size", "Verified tokens currently cached")
+    size.set(stats["size"])
+    lookups = Counter("auth_token_cache_lookups_total", "Token cache lookups by result", ("result",))
+    lookups.inc("hit", amount=stats["hits"])
+    lookups.inc("miss", amount=stats["misses"])
+    return [size, lookups]
+
+@registry.collector
+def collect_competencia_cache():
+    entries = Gauge("competencia_cache_entries", "Competências in the cached catalog")
+    size = Gauge("competencia_cache_bytes", "Size of the cached, serialized catalog")
+    lookups = Counter("competencia_cache_lookups_total", "Catalog cache lookups by result", ("result",))
+    for stats in competencia_cache_stats():
+        entries.inc(amount=stats["entries"])
+        size.inc(amount=stats["bytes"])
+        lookups.inc("hit", amount=stats["hits"])
+        lookups.inc("revalidated", amount=stats["revalidations"])
+        lookups.inc("miss", amount=stats["misses"])
+    return [entries, size, lookups]
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,58 @@
+import contextvars
+import os
+import re
+import time
+from collections import Counter
+
+from sqlalchemy import event
+
+# A statement shape repeated this many times in one request is reported as a
+# likely N+1 (lazy loads inside a loop).
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+_IN_LIST = re.compile(r"IN \((?:\s*(?:\?|%\(\w+\)s|\$\d+|__\[POSTCOMPILE_\w+\])\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.statements.append((statement, duration))
+
+    def repeated_shapes(self, threshold: int = None):
+        threshold = threshold or N_PLUS_ONE_THRESHOLD
+        shapes = Counter(statement_shape(statement) for statement, _ in self.statements)
+        return [{"statement": shape, "count": count} for shape, count in shapes.most_common() if count >= threshold]
+
+_current_stats = contextvars.ContextVar("sql_query_stats", default=None)
+
+def start_tracking() -> QueryStats:
+    stats = QueryStats()
+    _current_stats.set(stats)
+    return stats
+
+def current_stats():
+    return _current_stats.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_stats.get() is not None:
+        context._query_started_at = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started_at = getattr(context, "_query_started_at", None)
+    if stats is not None and started_at is not None:
+        stats.record(statement, time.perf_counter() - started_at)
+
+def install(engine):
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,109 @@
+import json
+import logging
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import StaticPool
+from app.monitoring import pool, sql
+from app.monitoring.metrics import Registry
+from app.monitoring.middleware import MetricsMiddleware, QueryTimingMiddleware
+from app.monitoring.router import router as monitoring_router
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+sql.install(engine)
+
+app = FastAPI()
+app.add_middleware(QueryTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.include_router(monitoring_router)
+
+@app.get("/items/{item_id}")
+def read_item(item_id: int):
+    if item_id == 0:
+        raise HTTPException(status_code=404, detail="Item não encontrado")
+    return {"id": item_id}
+
+@app.get("/lazy")
+def read_lazy():
+    with engine.connect() as conn:
+        return [conn.execute(text("SELECT :id"), {"id": i}).scalar() for i in range(6)]
+
+client = TestClient(app)
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+    requests.inc('/a"b')
+    requests.inc('/a"b')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render()
+    assert '# TYPE requests_total counter' in text
+    assert 'requests_total{route="/a\\"b"} 2' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert 'latency_seconds_count 3' in text
+
+def test_metrics_endpoint_uses_route_templates():
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+    assert client.get("/items/0").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in text
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="404"} 1' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}"} 3' in text
+    assert "/items/1" not in text
+    assert "db_pool_size" in text
+    assert "auth_token_cache_lookups_total" in text
+
+def test_statement_shape_collapses_in_lists():
+    first = sql.statement_shape("SELECT * FROM vaga_emprego\n WHERE id IN (?, ?, ?)")
+    second = sql.statement_shape("SELECT * FROM vaga_emprego WHERE id IN (?)")
+    assert first == second == "SELECT * FROM vaga_emprego WHERE id IN (...)"
+
+def test_query_timing_header_and_n_plus_one_warning(caplog):
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        response = client.get("/lazy")
+        assert client.get("/items/1").status_code == 200
+
+    assert response.json() == [0, 1, 2, 3, 4, 5]
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert 'desc="6 queries"' in response.headers["server-timing"]
+
+    lazy, item = [json.loads(record.getMessage()) for record in caplog.records]
+    assert lazy["route"] == "/lazy"
+    assert lazy["db_queries"] == 6
+    assert lazy["n_plus_one"] == [{"statement": "SELECT ?", "count": 6}]
+    assert caplog.records[0].levelno == logging.WARNING
+
+    assert item["route"] == "/items/{item_id}"
+    assert item["db_queries"] == 0
+    assert "n_plus_one" not in item
+    assert caplog.records[1].levelno == logging.INFO
+
+def test_instrumented_pool_records_wait_and_exhaustion(tmp_path):
+    limited = create_engine(
+        f"sqlite:///{tmp_path}/pool.db", poolclass=pool.InstrumentedQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    exhausted_before = pool.db_pool_exhausted_total._values.get(("sync",), 0)
+    timeouts_before = pool.db_pool_timeouts_total._values.get(("sync",), 0)
+
+    with limited.connect():
+        with pytest.raises(exc.TimeoutError):
+            limited.connect()
+
+    assert pool.db_pool_exhausted_total._values[("sync",)] == exhausted_before + 1
+    assert pool.db_pool_timeouts_total._values[("sync",)] == timeouts_before + 1
+    assert 'db_pool_checkout_wait_seconds_count{engine="sync"}' in client.get("/metrics").text
@@ -0,0 +1,90 @@
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app import compression
+from app.dependencies import etag
+
+app = FastAPI()
+
+@app.get("/plain/{size}")
+def plain(size: int):
+    return Response(content=b"[" + b"1," * size + b"1]", media_type="application/json", headers={"ETag": f'"{size}"'})
+
+@app.get("/encoded")
+def already_encoded():
+    return Response(content=compression.compress(b"[" + b"2," * 2000 + b"2]", "gzip"), media_type="application/json",
+                    headers={"Content-Encoding": "gzip"})
+
+@app.get("/stream")
+def stream():
+    return StreamingResponse((b'{"n":%d}\n' % i for i in range(100)), media_type="application/x-ndjson")
+
+@app.get("/image")
+def image():
+    return Response(content=b"\x89PNG" * 1000, media_type="image/png")
+
+@app.get("/revalidate")
+def revalidate():
+    return etag.not_modified(3)
+
+app.add_middleware(compression.CompressionMiddleware)
+
+client = TestClient(app)
+
+def test_negotiate_accept_encoding():
+    assert compression.negotiate(None) is None
+    assert compression.negotiate("identity") is None
+    assert compression.negotiate("gzip, deflate, br") == "br"
+    assert compression.negotiate("br;q=0.5, gzip") == "gzip"
+    assert compression.negotiate("br;q=0, *") == "gzip"
+    assert compression.negotiate("*;q=0") is None
+
+def test_encoded_etags():
+    assert compression.encoded_etag('"7"', "gzip") == '"7-gzip"'
+    assert compression.encoded_etag('W/"7"', "br") == 'W/"7"'
+    assert compression.decoded_etag('"7-br"') == '"7"'
+    assert compression.decoded_etag('"7-deflate"') == '"7-deflate"'
+
+    # Either form revalidates, and preconditions, the same version
+    assert etag.none_match('W/"5-gzip"', 5)
+    assert not etag.none_match('"5-deflate"', 5)
+    assert etag.if_match('"5-br", "6"') == [5, 6]
+
+def test_compression_middleware_threshold_and_streams():
+    big = client.get("/plain/2000", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["content-encoding"] == "gzip"
+    assert big.headers["vary"] == "Accept-Encoding"
+    assert int(big.headers["content-length"]) < len(big.content) == 4003
+    assert big.headers["etag"] == '"2000-gzip"'
+
+    assert client.get("/plain/2000", headers={"Accept-Encoding": "br"}).headers["content-encoding"] == "br"
+    small = client.get("/plain/10", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    identity = client.get("/plain/2000", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == '"2000"'
+    # Uncompressed forms vary by Accept-Encoding too, or a shared cache could
+    # serve them to clients that would have got the compressed one
+    for response in (small, identity, client.get("/plain/2000")):
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    # Already compressed upstream: not compressed twice
+    encoded = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert encoded.content == b"[" + b"2," * 2000 + b"2]"
+    assert encoded.headers["vary"] == "Accept-Encoding"
+
+    streamed = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert streamed.headers["content-encoding"] == "gzip"
+    assert "content-length" not in streamed.headers
+    assert streamed.text.splitlines()[-1] == '{"n":99}'
+
+def test_compression_middleware_vary_on_revalidation():
+    encoded = client.get("/revalidate", headers={"Accept-Encoding": "gzip", "If-None-Match": '"3-gzip"'})
+    assert encoded.status_code == 304
+    assert encoded.headers["etag"] == '"3-gzip"'
+    assert encoded.headers["vary"] == "Accept-Encoding"
+
+    # Only 304s confirming an encoded ETag, and only compressible 200s, vary
+    assert "vary" not in client.get("/revalidate", headers={"Accept-Encoding": "gzip", "If-None-Match": '"3"'}).headers
+    assert "vary" not in client.get("/revalidate", headers={"If-None-Match": '"3-gzip"'}).headers
+    assert "vary" not in client.get("/image", headers={"Accept-Encoding": "gzip"}).headers
@@ -1,18 +1,27 @@
-from sqlalchemy.orm import Session
+import os
+
+from sqlalchemy import select, update, exists, literal, func
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException
 
+from app.competencia.functions import get_competencias_records
+from app.database import fetch_records, insert_ignore, schema_columns, update_returning
 from app.model import models
 from app.dependencies import utils
+from app.vagas.index import get_index
 from . import schemas
 
+# When enabled, Vagaemprego.no_vagas also caps how many users can apply
+ENFORCE_VAGA_APPLICATION_CAP = os.getenv("ENFORCE_VAGA_APPLICATION_CAP", "false").lower() == "true"
+
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
 def get_user_by_cpf(db: Session, cpf: str):
     return db.query(models.User).filter(models.User.cpf == cpf).first()
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_pw = utils.hash_password(user.password)
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: str = None):
+    hashed_pw = hashed_password or utils.hash_password(user.password)
     db_user = models.User(
         nome=user.nome,
         email=user.email,
@@ -27,33 +36,28 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.refresh(db_user)
     return db_user
 
-def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate):
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
-
-    if not db_user:
-        return None
-
-    if user_update.nome is not None:
-        db_user.nome = user_update.nome
-    if user_update.email is not None:
-        db_user.email = user_update.email
-    if user_update.cpf is not None:
-        db_user.cpf = user_update.cpf
-    if user_update.telefone is not None:
-        db_user.telefone = user_update.telefone
-    if user_update.password is not None:
-        db_user.hashed_password = utils.hash_password(user_update.password)
+def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate, hashed_password: str = None):
+    values = user_update.model_dump(exclude={"password"}, exclude_none=True)
+    if hashed_password is not None:
+        values["hashed_password"] = hashed_password
+    elif user_update.password is not None:
+        values["hashed_password"] = utils.hash_password(user_update.password)
 
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return update_returning(db, models.User, user_id, values)
 
 def delete_user(db: Session, user_id: int):
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
 
     if not db_user:
-        return None 
+        return None
 
+    db.execute(
+        update(models.Vagaemprego)
+        .where(models.Vagaemprego.id.in_(
+            select(models.user_vaga_association.c.vaga_id).where(models.user_vaga_association.c.user_id == user_id)
+        ))
+        .values(no_candidatos=models.Vagaemprego.no_candidatos - 1)
+    )
     db.delete(db_user)
     db.commit()
     return db_user
@@ -61,19 +65,51 @@ def delete_user(db: Session, user_id: int):
 def get_users(db: Session):
     return db.query(models.User).all()
 
-def apply_to_vaga(db: Session, user_id: int, vaga_id: int):
-    user = db.query(models.User).get(user_id)
-    vaga = db.query(models.Vagaemprego).get(vaga_id)
-
-    if not user or not vaga:
-        raise HTTPException(status_code=404, detail="Usuário ou vaga não encontrado")
+def get_users_records(db: Session):
+    users = fetch_records(db, select(*schema_columns(models.User, schemas.User)))
+    competencias = get_competencias_records(db, models.user_competencia.c.user_id, [user["id"] for user in users])
+    for user in users:
+        user["competencias"] = competencias.get(user["id"], [])
+    return users
 
-    if user in vaga.candidatos:
+def apply_to_vaga(db: Session, user_id: int, vaga_id: int):
+    candidatura = insert_ignore(db, models.user_vaga_association).from_select(
+        ["user_id", "vaga_id"],
+        select(literal(user_id), models.Vagaemprego.id)
+        .where(models.Vagaemprego.id == vaga_id)
+        .where(exists().where(models.User.id == user_id)),
+    ).returning(models.user_vaga_association.c.vaga_id)
+
+    assento = update(models.Vagaemprego).values(no_candidatos=models.Vagaemprego.no_candidatos + 1)
+    if ENFORCE_VAGA_APPLICATION_CAP:
+        assento = assento.where(models.Vagaemprego.no_candidatos < models.Vagaemprego.no_vagas)
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Insert and seat increment in a single statement / round trip
+        inserida = candidatura.cte("inserida")
+        reservada = assento.where(models.Vagaemprego.id.in_(select(inserida.c.vaga_id))) \
+                           .returning(models.Vagaemprego.id).cte("reservada")
+        aplicou, reservou = db.execute(select(
+            select(func.count()).select_from(inserida).scalar_subquery(),
+            select(func.count()).select_from(reservada).scalar_subquery(),
+        )).one()
+    else:
+        aplicou = db.execute(candidatura).first() is not None
+        reservou = aplicou and db.execute(assento.where(models.Vagaemprego.id == vaga_id)).rowcount > 0
+
+    if not aplicou:
+        db.rollback()
+        user = db.query(models.User.id).filter(models.User.id == user_id).first()
+        vaga = db.query(models.Vagaemprego.id).filter(models.Vagaemprego.id == vaga_id).first()
+        if not user or not vaga:
+            raise HTTPException(status_code=404, detail="Usuário ou vaga não encontrado")
         raise HTTPException(status_code=400, detail="Usuário já candidatou a issa vaga")
 
-    vaga.candidatos.append(user)
+    if not reservou:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Vaga sem vagas disponíveis")
+
     db.commit()
-    db.refresh(vaga)
     return {"message": "Usuário candidatou com exito!"}
 
 def add_competencia_to_user(db: Session, user_id: int, competencia_id: int):
@@ -105,6 +141,38 @@ def remove_competencia_from_user(db: Session, user_id: int, competencia_id: int)
     db.commit()
     return {"message": "Competência removida do usuário com sucesso"}
 
+def set_user_competencias(db: Session, user_id: int, competencia_ids: list[int]):
+    if not db.query(models.User.id).filter(models.User.id == user_id).first():
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+    desejadas = set(competencia_ids)
+    existentes = set(db.execute(
+        select(models.Competencia.id).where(models.Competencia.id.in_(desejadas))
+    ).scalars().all()) if desejadas else set()
+    faltando = desejadas - existentes
+    if faltando:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Competência não encontrada: {', '.join(str(i) for i in sorted(faltando))}",
+        )
+
+    tabela = models.user_competencia
+    remover = tabela.delete().where(tabela.c.user_id == user_id)
+    if desejadas:
+        remover = remover.where(tabela.c.competencia_id.not_in(desejadas))
+    db.execute(remover)
+
+    if desejadas:
+        db.execute(insert_ignore(db, tabela).values([
+            {"user_id": user_id, "competencia_id": competencia_id} for competencia_id in sorted(desejadas)
+        ]))
+    db.commit()
+
+    return db.query(models.Competencia) \
+             .filter(models.Competencia.id.in_(desejadas)) \
+             .order_by(models.Competencia.id) \
+             .all() if desejadas else []
+
 def get_user_competencias(db: Session, user_id: int):
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
@@ -118,3 +186,57 @@ def get_user_applications(db: Session, user_id: int):
         raise HTTPException(status_code=404, detail="Usuario não encontrado")
 
     return [{"vaga_id": vaga.id, "titulo": vaga.titulo} for vaga in user.vagas_aplicadas]
+
+def get_user_applications_detailed(db: Session, user_id: int, limit: int = 50, offset: int = 0):
+    if not db.query(models.User.id).filter(models.User.id == user_id).first():
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+    vagas = db.query(models.Vagaemprego) \
+              .join(models.user_vaga_association, models.user_vaga_association.c.vaga_id == models.Vagaemprego.id) \
+              .filter(models.user_vaga_association.c.user_id == user_id) \
+              .options(selectinload(models.Vagaemprego.competencias)) \
+              .order_by(models.Vagaemprego.id) \
+              .limit(limit) \
+              .offset(offset) \
+              .all()
+
+    return [
+        {
+            "app": {
+                "id": vaga.id,
+                "vaga_id": vaga.id
+            },
+            "job": {
+                "id": vaga.id,
+                "titulo": vaga.titulo,
+                "descricao": vaga.descricao,
+                "salario": vaga.salario,
+                "modalidade": vaga.modalidade,
+                "no_vagas": vaga.no_vagas,
+                "empresa_id": vaga.empresa_id,
+                "competencias": [c.nome for c in vaga.competencias]
+            }
+        }
+        for vaga in vagas
+    ]
+
+def get_recommended_vagas(db: Session, user_id: int, limit: int = 20):
+    if not db.query(models.User.id).filter(models.User.id == user_id).first():
+        raise HTTPException(status_code=404, detail="Usuario não encontrado")
+
+    competencia_ids = db.execute(
+        select(models.user_competencia.c.competencia_id).where(models.user_competencia.c.user_id == user_id)
+    ).scalars().all()
+    if not competencia_ids:
+        return []
+
+    ranking = get_index(db).top_k(db, competencia_ids, limit)
+    if not ranking:
+        return []
+
+    vagas = db.query(models.Vagaemprego) \
+              .options(selectinload(models.Vagaemprego.competencias)) \
+              .filter(models.Vagaemprego.id.in_([vaga_id for vaga_id, _ in ranking])) \
+              .all()
+    por_id = {vaga.id: vaga for vaga in vagas}
+    return [{"vaga": por_id[vaga_id], "score": score} for vaga_id, score in ranking if vaga_id in por_id]
@@ -1,26 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_async_db
 from . import schemas, functions
+from app.competencia.schemas import Competencia
+from app.dependencies import utils
 from app.dependencies.auth import get_current_regular_user
 from app.model import models
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-@router.post("/", response_model=schemas.User)
-def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    if functions.get_user_by_email(db, user.email):
-        raise HTTPException(status_code=400, detail="Email já registrado")
-    if functions.get_user_by_cpf(db, user.cpf):
-        raise HTTPException(status_code=400, detail="CPF já registrado")
-    return functions.create_user(db, user)
+# Password hashing runs on the dedicated bcrypt executor; only the database
+# work goes through the request threadpool.
 
-@router.put("/{user_id}", response_model=schemas.User)
-def edit_user(user_id: int, user_update: schemas.UserUpdate, db: Session = Depends(get_db), current_regular_user: dict = Depends(get_current_regular_user)):
-    user = functions.update_user(db, user_id, user_update)
+def _check_new_user(db: Session, user: schemas.UserCreate):
+    try:
+        if functions.get_user_by_email(db, user.email):
+            raise HTTPException(status_code=400, detail="Email já registrado")
+        if functions.get_user_by_cpf(db, user.cpf):
+            raise HTTPException(status_code=400, detail="CPF já registrado")
+    finally:
+        # Hands the connection back to the pool while the password is hashed
+        db.close()
+
+def _create_user(db: Session, user: schemas.UserCreate, hashed_password: str):
+    return schemas.User.model_validate(functions.create_user(db, user, hashed_password), from_attributes=True)
+
+def _update_user(db: Session, user_id: int, user_update: schemas.UserUpdate, hashed_password: str):
+    user = functions.update_user(db, user_id, user_update, hashed_password)
     if not user:
         raise HTTPException(status_code=404, detail="Usuario não encontrado")
-    return user
+    return schemas.User.model_validate(user, from_attributes=True)
+
+@router.post("/", response_model=schemas.User)
+async def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    await run_in_threadpool(_check_new_user, db, user)
+    hashed_pw = await utils.hash_password_async(user.password)
+    return await run_in_threadpool(_create_user, db, user, hashed_pw)
+
+@router.put("/{user_id}", response_model=schemas.User)
+async def edit_user(user_id: int, user_update: schemas.UserUpdate, db: Session = Depends(get_db), current_regular_user: dict = Depends(get_current_regular_user)):
+    hashed_pw = None
+    if user_update.password is not None:
+        hashed_pw = await utils.hash_password_async(user_update.password)
+    return await run_in_threadpool(_update_user, db, user_id, user_update, hashed_pw)
 
 @router.delete("/{user_id}", response_model=schemas.User)
 def remove_user(user_id: int, db: Session = Depends(get_db), current_regular_user: dict = Depends(get_current_regular_user)):
@@ -39,11 +63,19 @@ def remove_competencia(user_id: int, competencia_id: int, db: Session = Depends(
     deleted = functions.remove_competencia_from_user(db, user_id, competencia_id)
     return deleted
 
+@router.put("/{user_id}/competencias", response_model=list[Competencia])
+def replace_competencias(user_id: int, competencias: schemas.UserCompetenciasUpdate, db: Session = Depends(get_db), current_regular_user: dict = Depends(get_current_regular_user)):
+    return functions.set_user_competencias(db, user_id, competencias.competencia_ids)
+
 @router.get("/{user_id}/competencias")
 def list_competencias(user_id: int, db: Session = Depends(get_db)):
     list = functions.get_user_competencias(db, user_id)
     return list
 
+@router.get("/{user_id}/recommended-vagas", response_model=list[schemas.VagaRecomendada])
+def list_recommended_vagas(user_id: int, limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_db)):
+    return functions.get_recommended_vagas(db, user_id, limit)
+
 @router.get("/me", response_model=schemas.User)
 def get_me(db: Session = Depends(get_db), current_regular_user: dict = Depends(get_current_regular_user)):
     user = db.query(models.User).filter(models.User.email == current_regular_user["email"]).first()
@@ -51,29 +83,11 @@ def get_me(db: Session = Depends(get_db), current_regular_user: dict = Depends(g
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-@router.get("/{user_id}/applications")
-def list_user_applications(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-
-    if not user:
-        raise HTTPException(status_code=404, detail="Usuário não encontrado")
-
-    applications = []
-    for vaga in user.vagas_aplicadas:
-        applications.append({
-            "app": {
-                "id": vaga.id,
-                "vaga_id": vaga.id
-            },
-            "job": {
-                "id": vaga.id,
-                "titulo": vaga.titulo,
-                "descricao": vaga.descricao,
-                "salario": vaga.salario,
-                "modalidade": vaga.modalidade,
-                "no_vagas": vaga.no_vagas,
-                "empresa_id": vaga.empresa.id,
-                "competencias": [c.nome for c in vaga.competencias]
-            }
-        })
-    return applications
\ No newline at end of file
+@router.get("/{user_id}/applications", response_model=list[schemas.UserApplication])
+async def list_user_applications(
+    user_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(functions.get_user_applications_detailed, user_id, limit=limit, offset=offset)
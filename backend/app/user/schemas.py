@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from app.competencia.schemas import Competencia
+from app.vagas.schemas import Vaga
 from typing import Optional
 
 class UserBase(BaseModel):
@@ -28,3 +29,28 @@ class User(UserBase):
 
     class Config:
         orm_mode = True
+
+class ApplicationInfo(BaseModel):
+    id: int
+    vaga_id: int
+
+class ApplicationJob(BaseModel):
+    id: int
+    titulo: str
+    descricao: str
+    salario: float
+    modalidade: str
+    no_vagas: int
+    empresa_id: int
+    competencias: list[str] = []
+
+class UserApplication(BaseModel):
+    app: ApplicationInfo
+    job: ApplicationJob
+
+class VagaRecomendada(BaseModel):
+    vaga: Vaga
+    score: int
+
+class UserCompetenciasUpdate(BaseModel):
+    competencia_ids: list[int]
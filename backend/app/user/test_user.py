@@ -1,14 +1,21 @@
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.user import functions as user_functions, schemas as user_schemas
 from app.vagas import functions as vagas_functions, schemas as vagas_schemas
 from app.empresa import functions as empresa_functions, schemas as empresa_schemas
 from app.admin import functions as admin_functions, schemas as admin_schemas
 from app.competencia import functions as competencia_functions, schemas as competencia_schemas
-from app.database import Base, get_db
+from app.database import Base, get_db, get_async_db
+from app.dependencies import utils
 from app.main import app
+from app.model import models
 
 # Unit tests
 
@@ -145,6 +152,10 @@ def test_get_users(db):
     assert "Jane" in names
     assert "Jane2" in names
 
+    records = user_functions.get_users_records(db)
+    assert records == [user_schemas.User.model_validate(user, from_attributes=True).model_dump() for user in users]
+    assert "hashed_password" not in records[0]
+
 def test_apply_to_vaga(db):
     user_data = user_schemas.UserCreate(
         nome="Carlos",
@@ -232,6 +243,180 @@ def test_get_user_competencias(db):
     assert len(comps) == 1
     assert comps[0].nome == "Java avancado"
 
+def test_set_user_competencias(db):
+    user_data = user_schemas.UserCreate(
+        nome="Carlos",
+        email="carlos@user.com",
+        cpf="231.443.234-90",
+        telefone="2234-1123",
+        password="userapplypass",
+        area_trabalho = "engenharia aeroespacial",
+        nivel_educacao = "superior"
+    )
+    user = user_functions.create_user(db, user_data)
+    comps = [
+        competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome=nome))
+        for nome in ("Java", "Python", "SQL")
+    ]
+    java, python, sql = (c.id for c in comps)
+
+    result = user_functions.set_user_competencias(db, user.id, [python, java, python])
+    assert [c.id for c in result] == [java, python]
+
+    result = user_functions.set_user_competencias(db, user.id, [sql, python])
+    assert [c.id for c in result] == [python, sql]
+    db.expire_all()
+    assert sorted(c.nome for c in user.competencias) == ["Python", "SQL"]
+
+    with pytest.raises(HTTPException) as exc_info:
+        user_functions.set_user_competencias(db, user.id, [java, 999])
+    assert exc_info.value.status_code == 404
+    assert exc_info.value.detail == "Competência não encontrada: 999"
+
+    assert user_functions.set_user_competencias(db, user.id, []) == []
+    db.expire_all()
+    assert user.competencias == []
+
+    with pytest.raises(HTTPException) as exc_info:
+        user_functions.set_user_competencias(db, user.id + 1, [java])
+    assert exc_info.value.status_code == 404
+
+    db.execute(models.user_competencia.insert().values(user_id=user.id, competencia_id=java))
+    with pytest.raises(IntegrityError):
+        db.execute(models.user_competencia.insert().values(user_id=user.id, competencia_id=java))
+    db.rollback()
+
+def test_get_recommended_vagas(db):
+    user_data = user_schemas.UserCreate(
+        nome="Carlos",
+        email="carlos@user.com",
+        cpf="231.443.234-90",
+        telefone="2234-1123",
+        password="userapplypass",
+        area_trabalho = "engenharia aeroespacial",
+        nivel_educacao = "superior"
+    )
+    admin_data = admin_schemas.AdminCreate(
+        nome="Anthony",
+        email="anthony@admin.com",
+        cpf="555.666.777-88",
+        telefone="8888-0000",
+        password="admingetcpfpass"
+    )
+    empresa_data = empresa_schemas.EmpresaCreate(
+        nome = "Teste",
+        descricao = "Empresa de teste",
+        cidade = "Brasilia",
+        cep = "1234567-89",
+        no_empregados = 15,
+        anos_func = 5,
+        admin_id = 1
+    )
+
+    user = user_functions.create_user(db, user_data)
+    admin_functions.create_admin(db, admin_data)
+    empresa_functions.create_empresa(db, empresa_data)
+    python = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Python"))
+    sql = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="SQL"))
+    java = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Java"))
+
+    vagas = []
+    for titulo in ("Backend Python", "Dados", "Backend Java"):
+        vagas.append(vagas_functions.create_vagaemprego(db, vagas_schemas.VagaCreate(
+            titulo = titulo,
+            descricao = "vaga para testar",
+            modalidade = "remoto",
+            salario = 2000,
+            no_vagas = 1,
+            empresa_id = 1
+        )))
+    vagas_functions.add_competencia_to_vaga(db, vagas[0].id, python.id)
+    vagas_functions.add_competencia_to_vaga(db, vagas[1].id, python.id)
+    vagas_functions.add_competencia_to_vaga(db, vagas[1].id, sql.id)
+    vagas_functions.add_competencia_to_vaga(db, vagas[2].id, java.id)
+
+    user_functions.add_competencia_to_user(db, user.id, python.id)
+    user_functions.add_competencia_to_user(db, user.id, sql.id)
+
+    recommended = user_functions.get_recommended_vagas(db, user.id)
+    assert [(r["vaga"].titulo, r["score"]) for r in recommended] == [("Dados", 2), ("Backend Python", 1)]
+
+    vagas_functions.remove_competencia_from_vaga(db, vagas[1].id, sql.id)
+    vagas_functions.add_competencia_to_vaga(db, vagas[2].id, sql.id)
+    recommended = user_functions.get_recommended_vagas(db, user.id, limit=2)
+    assert [(r["vaga"].titulo, r["score"]) for r in recommended] == [("Backend Python", 1), ("Dados", 1)]
+
+    vagas_functions.clear_vaga_competencias(db, vagas[0].id)
+    recommended = user_functions.get_recommended_vagas(db, user.id)
+    assert [r["vaga"].titulo for r in recommended] == ["Dados", "Backend Java"]
+
+def test_apply_to_vaga_is_idempotent_and_capped(db, monkeypatch):
+    admin_data = admin_schemas.AdminCreate(
+        nome="Anthony",
+        email="anthony@admin.com",
+        cpf="555.666.777-88",
+        telefone="8888-0000",
+        password="admingetcpfpass"
+    )
+    empresa_data = empresa_schemas.EmpresaCreate(
+        nome = "Teste",
+        descricao = "Empresa de teste",
+        cidade = "Brasilia",
+        cep = "1234567-89",
+        no_empregados = 15,
+        anos_func = 5,
+        admin_id = 1
+    )
+    vaga_data = vagas_schemas.VagaCreate(
+        titulo = "vaga teste",
+        descricao = "vaga para testar",
+        modalidade = "estagio",
+        salario = 200,
+        no_vagas = 1,
+        empresa_id = 1
+    )
+
+    admin_functions.create_admin(db, admin_data)
+    empresa_functions.create_empresa(db, empresa_data)
+    vaga = vagas_functions.create_vagaemprego(db, vaga_data)
+    users = [
+        user_functions.create_user(db, user_schemas.UserCreate(
+            nome=f"Carlos {i}",
+            email=f"carlos{i}@user.com",
+            cpf=f"231.443.234-9{i}",
+            telefone="2234-1123",
+            password="userapplypass",
+            area_trabalho = "engenharia aeroespacial",
+            nivel_educacao = "superior"
+        ))
+        for i in range(2)
+    ]
+
+    monkeypatch.setattr(user_functions, "ENFORCE_VAGA_APPLICATION_CAP", True)
+
+    result = user_functions.apply_to_vaga(db, users[0].id, vaga.id)
+    assert result["message"] == "Usuário candidatou com exito!"
+
+    with pytest.raises(Exception) as exc_info:
+        user_functions.apply_to_vaga(db, users[0].id, vaga.id)
+    assert exc_info.value.status_code == 400
+
+    with pytest.raises(Exception) as exc_info:
+        user_functions.apply_to_vaga(db, users[1].id, vaga.id)
+    assert exc_info.value.status_code == 409
+
+    with pytest.raises(Exception) as exc_info:
+        user_functions.apply_to_vaga(db, 999, vaga.id)
+    assert exc_info.value.status_code == 404
+
+    db.refresh(vaga)
+    assert vaga.no_candidatos == 1
+    assert [u.id for u in vaga.candidatos] == [users[0].id]
+
+    user_functions.delete_user(db, users[0].id)
+    db.refresh(vaga)
+    assert vaga.no_candidatos == 0
+
 # Integration tests
 
 SQLALCHEMY_DATABASE_URL_INTEGRATION = "sqlite:///./test_admin_integration.db"
@@ -247,6 +432,17 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# NullPool: TestClient may run each request on a fresh event loop
+SQLALCHEMY_ASYNC_DATABASE_URL_INTEGRATION = "sqlite+aiosqlite:///./test_admin_integration.db"
+async_engine_integration = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL_INTEGRATION, poolclass=NullPool)
+TestingAsyncSessionLocal_integration = async_sessionmaker(async_engine_integration, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal_integration() as db:
+        yield db
+
+app.dependency_overrides[get_async_db] = override_get_async_db
+
 @pytest.fixture(scope="function", autouse=True)
 def setup_and_teardown_db():
     Base.metadata.create_all(bind=engine_integration)
@@ -357,6 +553,38 @@ def test_register_user_duplicate_cpf(user_payload_cpf):
     assert response.status_code == 400
     assert "CPF already registered" in response.text
 
+def test_register_user_releases_connection_while_hashing(monkeypatch):
+    sessions = []
+    def tracking_get_db():
+        db = TestingSessionLocal_integration()
+        sessions.append(db)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    hash_password_async = utils.hash_password_async
+    in_transaction = []
+    async def checking_hash(password):
+        in_transaction.append(sessions[-1].in_transaction())
+        return await hash_password_async(password)
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, tracking_get_db)
+    monkeypatch.setattr(utils, "hash_password_async", checking_hash)
+    payload = {
+        "nome": "Clara",
+        "email": "clara@user.com",
+        "cpf": "321.654.987-00",
+        "telefone": "8888-0000",
+        "password": "clarauserpass",
+        "area_trabalho": "Vendas",
+        "nivel_educacao": "superior"
+    }
+
+    response = client.post("/users/", json=payload)
+    assert response.status_code == 200
+    assert in_transaction == [False]
+
 def test_user_add_list_remove_competencia():
     user_payload = {
         "nome": "Carlos",
@@ -390,4 +618,65 @@ def test_user_add_list_remove_competencia():
 
     list_resp_deleted = client.get(f"/users/{user_id}/competencias")
     assert list_resp_deleted.status_code == 200 or list_resp_deleted.status_code == 201
-    assert list_resp_deleted.json() == []
\ No newline at end of file
+    assert list_resp_deleted.json() == []
+
+def test_list_user_applications_query_count():
+    db = TestingSessionLocal_integration()
+    admin = admin_functions.create_admin(db, admin_schemas.AdminCreate(
+        nome="Anthony",
+        email="anthony@admin.com",
+        cpf="555.666.777-88",
+        telefone="8888-0000",
+        password="admingetcpfpass"
+    ))
+    empresa = empresa_functions.create_empresa(db, empresa_schemas.EmpresaCreate(
+        nome = "Teste",
+        descricao = "Empresa de teste",
+        cidade = "Brasilia",
+        cep = "1234567-89",
+        no_empregados = 15,
+        anos_func = 5,
+        admin_id = admin.id
+    ))
+    user = user_functions.create_user(db, user_schemas.UserCreate(
+        nome="Carlos",
+        email="carlos@user.com",
+        cpf="231.443.234-90",
+        telefone="2234-1123",
+        password="userapplypass",
+        area_trabalho = "engenharia aeroespacial",
+        nivel_educacao = "superior"
+    ))
+    comp = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Python"))
+    for i in range(30):
+        vaga = vagas_functions.create_vagaemprego(db, vagas_schemas.VagaCreate(
+            titulo = f"vaga {i}",
+            descricao = "vaga para testar",
+            modalidade = "estagio",
+            salario = 200,
+            no_vagas = 10,
+            empresa_id = empresa.id
+        ))
+        vagas_functions.add_competencia_to_vaga(db, vaga.id, comp.id)
+        user_functions.apply_to_vaga(db, user.id, vaga.id)
+    user_id = user.id
+    db.close()
+
+    statements = []
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", count_statement)
+    try:
+        response = client.get(f"/users/{user_id}/applications?limit=25")
+    finally:
+        event.remove(Engine, "before_cursor_execute", count_statement)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 25
+    assert data[0]["job"]["competencias"] == ["Python"]
+    assert len(statements) <= 3
+
+    response = client.get(f"/users/{user_id}/applications?limit=25&offset=25")
+    assert len(response.json()) == 5
@@ -1,54 +1,182 @@
+import codecs
+import csv
+import heapq
+import io
+import json
+import os
+import re
+from collections import Counter
+
+from pydantic import ValidationError
+from sqlalchemy import func, distinct, insert, or_, select, text, update, literal_column
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, selectinload
 
+from app.cache.response import invalidate
+from app.competencia.functions import get_competencias_records
+from app.database import fetch_records, insert_ignore, schema_columns, update_returning
+from app.dependencies.etag import check_version
 from app.model import models
 from . import schemas
+from .index import get_index
 from fastapi import HTTPException
 
 def create_vagaemprego(db: Session, vaga: schemas.VagaCreate):
     db_vaga = models.Vagaemprego(**vaga.model_dump())
     db.add(db_vaga)
     db.commit()
+    invalidate("vagas")
     db.refresh(db_vaga)
     return db_vaga
 
-def update_vaga(db: Session, vaga_id: int, vaga_update: schemas.VagaUpdate):
-    db_vaga = db.query(models.Vagaemprego).filter(models.Vagaemprego.id == vaga_id).first()
-
-    if not db_vaga:
-        return None
-
-    if vaga_update.titulo is not None:
-        db_vaga.titulo = vaga_update.titulo
-    if vaga_update.descricao is not None:
-        db_vaga.descricao = vaga_update.descricao
-    if vaga_update.modalidade is not None:
-        db_vaga.modalidade = vaga_update.modalidade
-    if vaga_update.salario is not None:
-        db_vaga.salario = vaga_update.salario
-    if vaga_update.no_vagas is not None:
-        db_vaga.no_vagas = vaga_update.no_vagas
+def update_vaga(db: Session, vaga_id: int, vaga_update: schemas.VagaUpdate, versions: list[int] = None):
+    updated = update_returning(db, models.Vagaemprego, vaga_id, vaga_update.model_dump(exclude_none=True), versions)
+    if updated:
+        invalidate("vagas")
+    return updated
 
-    db.commit()
-    db.refresh(db_vaga)
-    return db_vaga
-
-def delete_vaga(db: Session, vaga_id: int):
-    db_vaga = db.query(models.Vagaemprego).filter(models.Vagaemprego.id == vaga_id).first()
+def delete_vaga(db: Session, vaga_id: int, versions: list[int] = None):
+    query = db.query(models.Vagaemprego).filter(models.Vagaemprego.id == vaga_id)
+    if versions is not None:
+        query = query.with_for_update()
+    db_vaga = query.first()
 
     if not db_vaga:
         return None
 
+    check_version(db_vaga.version, versions)
     db.delete(db_vaga)
     db.commit()
+    invalidate("vagas")
+    get_index(db).remove_vaga(vaga_id)
     return db_vaga
 
-def get_vagas(db: Session):
+def get_vaga(db: Session, vaga_id: int):
     return db.query(models.Vagaemprego) \
              .options(selectinload(models.Vagaemprego.competencias)) \
-             .all()
+             .filter(models.Vagaemprego.id == vaga_id) \
+             .first()
+
+def get_vaga_version(db: Session, vaga_id: int):
+    return db.execute(select(models.Vagaemprego.version).where(models.Vagaemprego.id == vaga_id)).scalar()
+
+def get_vagas_version(db: Session):
+    return db.execute(
+        select(models.collection_versions.c.version).where(models.collection_versions.c.nome == "vagas")
+    ).scalar()
+
+def _bump_versions(db: Session, vaga_ids):
+    # Competências are part of the vaga representation, so they change its ETag
+    db.execute(
+        update(models.Vagaemprego)
+        .where(models.Vagaemprego.id.in_(vaga_ids))
+        .values(version=models.Vagaemprego.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def get_vagas(
+    db: Session,
+    cursor: int = None,
+    limit: int = 50,
+    modalidade: str = None,
+    salario_min: float = None,
+    salario_max: float = None,
+    empresa_id: int = None,
+    competencia_ids: list[int] = None,
+):
+    query = db.query(models.Vagaemprego) \
+              .options(selectinload(models.Vagaemprego.competencias))
+    query = _filter_vagas(query, cursor, modalidade, salario_min, salario_max, empresa_id, competencia_ids)
+
+    vagas = query.order_by(models.Vagaemprego.id).limit(limit + 1).all()
+
+    next_cursor = vagas[limit - 1].id if len(vagas) > limit else None
+    return vagas[:limit], next_cursor
+
+def get_vagas_records(
+    db: Session,
+    cursor: int = None,
+    limit: int = 50,
+    modalidade: str = None,
+    salario_min: float = None,
+    salario_max: float = None,
+    empresa_id: int = None,
+    competencia_ids: list[int] = None,
+):
+    # Same page as get_vagas, as plain dicts shaped like schemas.Vaga
+    query = select(*schema_columns(models.Vagaemprego, schemas.Vaga))
+    query = _filter_vagas(query, cursor, modalidade, salario_min, salario_max, empresa_id, competencia_ids)
+    vagas = fetch_records(db, query.order_by(models.Vagaemprego.id).limit(limit + 1))
+
+    next_cursor = vagas[limit - 1]["id"] if len(vagas) > limit else None
+    vagas = vagas[:limit]
+    competencias = get_competencias_records(db, models.vaga_competencia.c.vaga_id, [vaga["id"] for vaga in vagas])
+    for vaga in vagas:
+        vaga["competencias"] = competencias.get(vaga["id"], [])
+    return vagas, next_cursor
+
+def _filter_vagas(query, cursor, modalidade, salario_min, salario_max, empresa_id, competencia_ids):
+    # Works on both ORM queries and Core selects
+    if cursor is not None:
+        query = query.filter(models.Vagaemprego.id > cursor)
+    if modalidade is not None:
+        query = query.filter(models.Vagaemprego.modalidade == modalidade)
+    if salario_min is not None:
+        query = query.filter(models.Vagaemprego.salario >= salario_min)
+    if salario_max is not None:
+        query = query.filter(models.Vagaemprego.salario <= salario_max)
+    if empresa_id is not None:
+        query = query.filter(models.Vagaemprego.empresa_id == empresa_id)
+    if competencia_ids:
+        # Only vagas that require every requested competencia
+        ids = set(competencia_ids)
+        com_todas = select(models.vaga_competencia.c.vaga_id) \
+            .where(models.vaga_competencia.c.competencia_id.in_(ids)) \
+            .group_by(models.vaga_competencia.c.vaga_id) \
+            .having(func.count(distinct(models.vaga_competencia.c.competencia_id)) == len(ids))
+        query = query.filter(models.Vagaemprego.id.in_(com_todas))
+    return query
+
+def search_vagas(db: Session, q: str, limit: int = 20, offset: int = 0):
+    termos = re.findall(r"\w+", q)
+    if not termos:
+        return []
+
+    if db.get_bind().dialect.name == "postgresql":
+        consulta = func.websearch_to_tsquery(literal_column("'portuguese'::regconfig"), q)
+        search_vector = literal_column("vaga_emprego.search_vector")
+        ids = db.execute(
+            select(models.Vagaemprego.id)
+            .where(search_vector.op("@@")(consulta))
+            .order_by(func.ts_rank_cd(search_vector, consulta).desc(), models.Vagaemprego.id)
+            .limit(limit)
+            .offset(offset)
+        ).scalars().all()
+    else:
+        consulta = " ".join('"%s"' % termo for termo in termos)
+        ids = db.execute(
+            text(
+                "SELECT rowid FROM vaga_emprego_fts WHERE vaga_emprego_fts MATCH :q "
+                "ORDER BY bm25(vaga_emprego_fts, 2.0, 1.0), rowid LIMIT :limit OFFSET :offset"
+            ),
+            {"q": consulta, "limit": limit, "offset": offset},
+        ).scalars().all()
+
+    if not ids:
+        return []
+
+    vagas = db.query(models.Vagaemprego) \
+              .options(selectinload(models.Vagaemprego.competencias)) \
+              .filter(models.Vagaemprego.id.in_(ids)) \
+              .all()
+    por_id = {vaga.id: vaga for vaga in vagas}
+    return [por_id[vaga_id] for vaga_id in ids if vaga_id in por_id]
 
 def get_vagas_by_empresa(db: Session, empresa_id: int):
-    return db.query(models.Vagaemprego).filter(models.Vagaemprego.empresa_id == empresa_id).all()
+    return db.query(models.Vagaemprego) \
+             .options(selectinload(models.Vagaemprego.competencias)) \
+             .filter(models.Vagaemprego.empresa_id == empresa_id) \
+             .all()
 
 def get_vagas_by_admin(db: Session, admin_id: int):
     vagas = db.query(models.Vagaemprego).join(models.Empresa, models.Vagaemprego.empresa_id == models.Empresa.id).filter(models.Empresa.admin_id == admin_id).all()
@@ -65,7 +193,10 @@ def add_competencia_to_vaga(db: Session, vaga_id: int, competencia_id: int):
         raise HTTPException(status_code=400, detail="Competência já associada à vaga")
 
     vaga.competencias.append(competencia)
+    _bump_versions(db, [vaga_id])
     db.commit()
+    invalidate("vagas")
+    get_index(db).add(vaga_id, competencia_id)
     return {"message": "Competência adicionada à vaga com sucesso"}
 
 
@@ -80,7 +211,10 @@ def remove_competencia_from_vaga(db: Session, vaga_id: int, competencia_id: int)
         raise HTTPException(status_code=400, detail="Competência não associada à vaga")
 
     vaga.competencias.remove(competencia)
+    _bump_versions(db, [vaga_id])
     db.commit()
+    invalidate("vagas")
+    get_index(db).remove(vaga_id, competencia_id)
     return {"message": "Competência removida da vaga com sucesso"}
 
 def clear_vaga_competencias(db: Session, vaga_id: int):
@@ -89,16 +223,169 @@ def clear_vaga_competencias(db: Session, vaga_id: int):
         return None
 
     vaga.competencias.clear()
+    _bump_versions(db, [vaga_id])
     db.commit()
+    invalidate("vagas")
+    get_index(db).remove_vaga(vaga_id)
     db.refresh(vaga)
     return vaga
 
+# Same ceiling as the explicit vaga_ids list, so an empresa_id batch can't
+# grow the request (and its per-pair results) without bound
+MAX_VAGAS_LOTE = 1000
+
+def _competencias_em_lote(db: Session, vaga_ids: list[int], competencia_ids: list[int], admin_id: int, empresa_id: int = None, associar: bool = True):
+    # Fixed number of statements whatever the batch size: resolve vagas,
+    # resolve competencias, read current links, one INSERT or DELETE, one version
+    # bump, commit.
+    if not vaga_ids and empresa_id is None:
+        raise HTTPException(status_code=400, detail="Informe vaga_ids ou empresa_id")
+
+    vagas_pedidas = set(vaga_ids)
+    competencias_pedidas = set(competencia_ids)
+
+    filtros = []
+    if vagas_pedidas:
+        filtros.append(models.Vagaemprego.id.in_(vagas_pedidas))
+    if empresa_id is not None:
+        filtros.append(models.Vagaemprego.empresa_id == empresa_id)
+    # Only vagas of the admin's own empresas; the rest count as not found
+    vagas = set(db.execute(
+        select(models.Vagaemprego.id)
+        .join(models.Empresa, models.Vagaemprego.empresa_id == models.Empresa.id)
+        .where(models.Empresa.admin_id == admin_id)
+        .where(or_(*filtros))
+        .limit(MAX_VAGAS_LOTE + 1)
+    ).scalars().all())
+    if len(vagas) > MAX_VAGAS_LOTE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"O lote ultrapassa {MAX_VAGAS_LOTE} vagas; informe vaga_ids em partes menores",
+        )
+    competencias = set(db.execute(
+        select(models.Competencia.id).where(models.Competencia.id.in_(competencias_pedidas))
+    ).scalars().all()) if competencias_pedidas else set()
+
+    tabela = models.vaga_competencia
+    existentes = set()
+    if vagas and competencias:
+        existentes = set(db.execute(
+            select(tabela.c.vaga_id, tabela.c.competencia_id)
+            .where(tabela.c.vaga_id.in_(vagas))
+            .where(tabela.c.competencia_id.in_(competencias))
+        ).tuples().all())
+
+    pares = [(v, c) for v in vagas for c in competencias]
+    if associar:
+        alterados = [par for par in pares if par not in existentes]
+        if alterados:
+            # A concurrent batch or add may have linked a pair since it was read
+            db.execute(insert_ignore(db, tabela), [{"vaga_id": v, "competencia_id": c} for v, c in alterados])
+    else:
+        alterados = [par for par in pares if par in existentes]
+        if alterados:
+            db.execute(
+                tabela.delete()
+                .where(tabela.c.vaga_id.in_({v for v, _ in alterados}))
+                .where(tabela.c.competencia_id.in_({c for _, c in alterados}))
+            )
+    if alterados:
+        _bump_versions(db, {v for v, _ in alterados})
+    db.commit()
+    if alterados:
+        invalidate("vagas")
+
+    index = get_index(db)
+    for vaga_id, competencia_id in alterados:
+        if associar:
+            index.add(vaga_id, competencia_id)
+        else:
+            index.remove(vaga_id, competencia_id)
+
+    alterados = set(alterados)
+    status_alterado, status_inalterado = ("associada", "ja_associada") if associar else ("removida", "nao_associada")
+    resultados = []
+    for vaga_id in sorted(vagas | vagas_pedidas):
+        for competencia_id in sorted(competencias_pedidas):
+            if vaga_id not in vagas:
+                status = "vaga_nao_encontrada"
+            elif competencia_id not in competencias:
+                status = "competencia_nao_encontrada"
+            elif (vaga_id, competencia_id) in alterados:
+                status = status_alterado
+            else:
+                status = status_inalterado
+            resultados.append({"vaga_id": vaga_id, "competencia_id": competencia_id, "status": status})
+
+    return {"resumo": dict(Counter(r["status"] for r in resultados)), "resultados": resultados}
+
+def attach_competencias_to_vagas(db: Session, vaga_ids: list[int], competencia_ids: list[int], admin_id: int, empresa_id: int = None):
+    return _competencias_em_lote(db, vaga_ids, competencia_ids, admin_id, empresa_id, associar=True)
+
+def detach_competencias_from_vagas(db: Session, vaga_ids: list[int], competencia_ids: list[int], admin_id: int, empresa_id: int = None):
+    return _competencias_em_lote(db, vaga_ids, competencia_ids, admin_id, empresa_id, associar=False)
+
 def get_vaga_competencias(db: Session, vaga_id: int):
     vaga = db.query(models.Vagaemprego).filter(models.Vagaemprego.id == vaga_id).first()
     if not vaga:
         return {"error": "Vaga not found"}
     return vaga.competencias
 
+def rank_candidates(db: Session, vaga_id: int, admin_id: int, limit: int = 20, offset: int = 0):
+    # Only the admin of the vaga's empresa sees its applicants
+    vaga = db.query(models.Vagaemprego.id) \
+        .join(models.Empresa, models.Vagaemprego.empresa_id == models.Empresa.id) \
+        .filter(models.Vagaemprego.id == vaga_id) \
+        .filter(models.Empresa.admin_id == admin_id) \
+        .first()
+    if not vaga:
+        raise HTTPException(status_code=404, detail="Vaga não encontrada")
+
+    candidatos = select(models.user_vaga_association.c.user_id) \
+        .where(models.user_vaga_association.c.vaga_id == vaga_id)
+
+    usuarios = db.execute(
+        select(models.User.id, models.User.nome).where(models.User.id.in_(candidatos))
+    ).all()
+    if not usuarios:
+        return []
+
+    competencias_vaga = select(models.vaga_competencia.c.competencia_id) \
+        .where(models.vaga_competencia.c.vaga_id == vaga_id)
+
+    em_comum = {}
+    for user_id, competencia_id in db.execute(
+        select(models.user_competencia.c.user_id, models.user_competencia.c.competencia_id)
+        .where(models.user_competencia.c.user_id.in_(candidatos))
+        .where(models.user_competencia.c.competencia_id.in_(competencias_vaga))
+    ):
+        em_comum.setdefault(user_id, set()).add(competencia_id)
+
+    anos = dict(db.execute(
+        select(models.Experiencia.user_id, func.sum(models.Experiencia.anos))
+        .where(models.Experiencia.user_id.in_(candidatos))
+        .group_by(models.Experiencia.user_id)
+    ).all())
+
+    ranking = []
+    for user_id, nome in usuarios:
+        competencias_em_comum = len(em_comum.get(user_id, ()))
+        anos_experiencia = anos.get(user_id) or 0
+        ranking.append({
+            "id": user_id,
+            "nome": nome,
+            "score": competencias_em_comum * (1 + anos_experiencia),
+            "competencias_em_comum": competencias_em_comum,
+            "anos_experiencia": anos_experiencia,
+        })
+
+    top = heapq.nlargest(
+        offset + limit,
+        ranking,
+        key=lambda c: (c["score"], c["competencias_em_comum"], c["anos_experiencia"], -c["id"]),
+    )
+    return top[offset:]
+
 def get_vagas_with_applications_for_admin(db: Session, admin_id: int):
     vagas = db.query(models.Vagaemprego) \
         .join(models.Empresa, models.Vagaemprego.empresa_id == models.Empresa.id) \
@@ -117,4 +404,217 @@ def get_vagas_with_applications_for_admin(db: Session, admin_id: int):
             ]
         })
     
-    return result
\ No newline at end of file
+    return result
+
+EXPORT_COLUMNS = ["vaga_id", "titulo", "empresa_id", "user_id", "nome", "email"]
+
+def iter_applications_for_admin(db: Session, admin_id: int, chunk_size: int = 1000):
+    stmt = select(
+        models.Vagaemprego.id,
+        models.Vagaemprego.titulo,
+        models.Vagaemprego.empresa_id,
+        models.User.id,
+        models.User.nome,
+        models.User.email,
+    ) \
+        .join(models.Empresa, models.Vagaemprego.empresa_id == models.Empresa.id) \
+        .join(models.user_vaga_association, models.user_vaga_association.c.vaga_id == models.Vagaemprego.id) \
+        .join(models.User, models.User.id == models.user_vaga_association.c.user_id) \
+        .where(models.Empresa.admin_id == admin_id) \
+        .order_by(models.Vagaemprego.id, models.User.id) \
+        .execution_options(yield_per=chunk_size)
+
+    for partition in db.execute(stmt).partitions():
+        yield [dict(zip(EXPORT_COLUMNS, row)) for row in partition]
+
+def export_applications_ndjson(chunks):
+    for chunk in chunks:
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in chunk)
+
+def export_applications_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+
+# Bulk import: rows are validated and inserted IMPORT_CHUNK_SIZE at a time, one
+# commit per chunk, so a bad row only costs an entry in the error list.
+IMPORT_CHUNK_SIZE = int(os.getenv("VAGA_IMPORT_CHUNK_SIZE", "5000"))
+MAX_IMPORT_ERRORS = 1000
+VAGA_COLUMNS = ["titulo", "descricao", "modalidade", "salario", "no_vagas", "empresa_id"]
+
+def iter_lines(chunks):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    for chunk in chunks:
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+def parse_import_rows(lines, formato: str = "ndjson"):
+    if formato == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            competencias = row.pop("competencias", None) or ""
+            row["competencias"] = [nome for nome in competencias.split(";") if nome.strip()]
+            yield reader.line_num, row
+        return
+
+    for linha, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield linha, ValueError(f"JSON inválido: {e.msg}")
+            continue
+        yield linha, row if isinstance(row, dict) else ValueError("Cada linha deve ser um objeto JSON")
+
+def _validate_import_row(row):
+    if isinstance(row, Exception):
+        raise row
+    competencias = row.pop("competencias", None) or []
+    if not isinstance(competencias, list) or not all(isinstance(nome, str) for nome in competencias):
+        raise ValueError("competencias deve ser uma lista de nomes")
+    vaga = schemas.VagaCreate.model_validate(row)
+    return vaga.model_dump(), {nome.strip() for nome in competencias if nome.strip()}
+
+def _describe_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors()
+    )
+
+def _copy_rows(db: Session, table: str, columns: list, rows: list):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+
+    cursor = db.connection().connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            cursor.copy_expert(sql, buffer)
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+def _insert_vagas(db: Session, vagas: list) -> list:
+    if db.get_bind().dialect.name == "postgresql":
+        # COPY cannot return ids, so take them from the sequence up front
+        ids = db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('vaga_emprego', 'id')) FROM generate_series(1, :n)"),
+            {"n": len(vagas)},
+        ).scalars().all()
+        _copy_rows(db, "vaga_emprego", ["id"] + VAGA_COLUMNS, [
+            [vaga_id] + [vaga[column] for column in VAGA_COLUMNS] for vaga_id, vaga in zip(ids, vagas)
+        ])
+        return ids
+
+    if db.get_bind().dialect.name == "sqlite":
+        # Plain executemany; SQLite has a single writer, so rows inserted in this
+        # transaction get consecutive rowids ending at last_insert_rowid()
+        db.execute(insert(models.Vagaemprego.__table__), vagas)
+        last_id = db.execute(text("SELECT last_insert_rowid()")).scalar()
+        return list(range(last_id - len(vagas) + 1, last_id + 1))
+
+    return db.execute(
+        insert(models.Vagaemprego).returning(models.Vagaemprego.id, sort_by_parameter_order=True),
+        vagas,
+    ).scalars().all()
+
+def _insert_vaga_competencias(db: Session, pares: list):
+    if db.get_bind().dialect.name == "postgresql":
+        _copy_rows(db, "vaga_competencia", ["vaga_id", "competencia_id"], pares)
+    else:
+        db.execute(
+            insert(models.vaga_competencia),
+            [{"vaga_id": vaga_id, "competencia_id": competencia_id} for vaga_id, competencia_id in pares],
+        )
+
+def _import_chunk(db: Session, chunk: list, empresa_ids: set, resultado: dict):
+    def erro(linha, mensagem):
+        resultado["total_erros"] += 1
+        if len(resultado["erros"]) < MAX_IMPORT_ERRORS:
+            resultado["erros"].append({"linha": linha, "erro": mensagem})
+
+    validas = []
+    for linha, row in chunk:
+        try:
+            vaga, nomes = _validate_import_row(row)
+        except ValidationError as e:
+            erro(linha, _describe_validation_error(e))
+            continue
+        except ValueError as e:
+            erro(linha, str(e))
+            continue
+        if vaga["empresa_id"] not in empresa_ids:
+            erro(linha, "Empresa não encontrada")
+            continue
+        validas.append((linha, vaga, nomes))
+
+    todos_nomes = set().union(*(nomes for _, _, nomes in validas))
+    competencia_ids = dict(db.execute(
+        select(models.Competencia.nome, models.Competencia.id).where(models.Competencia.nome.in_(todos_nomes))
+    ).all()) if todos_nomes else {}
+
+    linhas = []
+    for linha, vaga, nomes in validas:
+        desconhecidas = sorted(nomes - competencia_ids.keys())
+        if desconhecidas:
+            erro(linha, f"Competência não encontrada: {', '.join(desconhecidas)}")
+            continue
+        linhas.append((linha, vaga, nomes))
+
+    if not linhas:
+        return
+
+    try:
+        ids = _insert_vagas(db, [vaga for _, vaga, _ in linhas])
+        pares = [
+            (vaga_id, competencia_ids[nome])
+            for vaga_id, (_, _, nomes) in zip(ids, linhas)
+            for nome in nomes
+        ]
+        if pares:
+            _insert_vaga_competencias(db, pares)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        for linha, _, _ in linhas:
+            erro(linha, f"Erro ao inserir lote: {e.__class__.__name__}")
+        return
+
+    resultado["importadas"] += len(linhas)
+    invalidate("vagas")
+    if pares:
+        get_index(db).invalidate()
+
+def import_vagas(db: Session, admin_id: int, rows, chunk_size: int = IMPORT_CHUNK_SIZE):
+    empresa_ids = set(db.execute(
+        select(models.Empresa.id).where(models.Empresa.admin_id == admin_id)
+    ).scalars().all())
+
+    resultado = {"total": 0, "importadas": 0, "total_erros": 0, "erros": []}
+    chunk = []
+    for linha, row in rows:
+        resultado["total"] += 1
+        chunk.append((linha, row))
+        if len(chunk) >= chunk_size:
+            _import_chunk(db, chunk, empresa_ids, resultado)
+            chunk = []
+    if chunk:
+        _import_chunk(db, chunk, empresa_ids, resultado)
+    resultado["erros"].sort(key=lambda e: e["linha"])
+    return resultado
@@ -0,0 +1,98 @@
+import heapq
+import os
+import threading
+import time
+import weakref
+from collections import Counter
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.model import models
+
+# Each worker keeps its own index; reloading it after this many seconds bounds
+# how long changes made by other workers can go unnoticed.
+INDEX_TTL = float(os.getenv("COMPETENCIA_INDEX_TTL", "60"))
+
+class CompetenciaIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vagas_por_competencia: dict[int, set[int]] = {}
+        self._competencias_por_vaga: dict[int, set[int]] = {}
+        self._loaded_at = None
+
+    def ensure_loaded(self, db: Session):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < INDEX_TTL:
+            return
+
+        rows = db.execute(
+            select(models.vaga_competencia.c.vaga_id, models.vaga_competencia.c.competencia_id)
+        ).all()
+
+        vagas_por_competencia = {}
+        competencias_por_vaga = {}
+        for vaga_id, competencia_id in rows:
+            vagas_por_competencia.setdefault(competencia_id, set()).add(vaga_id)
+            competencias_por_vaga.setdefault(vaga_id, set()).add(competencia_id)
+
+        with self._lock:
+            self._vagas_por_competencia = vagas_por_competencia
+            self._competencias_por_vaga = competencias_por_vaga
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._vagas_por_competencia = {}
+            self._competencias_por_vaga = {}
+            self._loaded_at = None
+
+    def add(self, vaga_id: int, competencia_id: int):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._vagas_por_competencia.setdefault(competencia_id, set()).add(vaga_id)
+            self._competencias_por_vaga.setdefault(vaga_id, set()).add(competencia_id)
+
+    def remove(self, vaga_id: int, competencia_id: int):
+        with self._lock:
+            self._vagas_por_competencia.get(competencia_id, set()).discard(vaga_id)
+            self._competencias_por_vaga.get(vaga_id, set()).discard(competencia_id)
+
+    def remove_vaga(self, vaga_id: int):
+        with self._lock:
+            for competencia_id in self._competencias_por_vaga.pop(vaga_id, ()):
+                self._vagas_por_competencia.get(competencia_id, set()).discard(vaga_id)
+
+    def remove_competencia(self, competencia_id: int):
+        with self._lock:
+            for vaga_id in self._vagas_por_competencia.pop(competencia_id, ()):
+                self._competencias_por_vaga.get(vaga_id, set()).discard(competencia_id)
+
+    def top_k(self, db: Session, competencia_ids, k: int):
+        self.ensure_loaded(db)
+
+        scores = Counter()
+        with self._lock:
+            for competencia_id in set(competencia_ids):
+                scores.update(self._vagas_por_competencia.get(competencia_id, ()))
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+_indexes = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+
+def get_index(db: Session) -> CompetenciaIndex:
+    engine = db.get_bind()
+    with _indexes_lock:
+        index = _indexes.get(engine)
+        if index is None:
+            index = _indexes[engine] = CompetenciaIndex()
+    return index
+
+def _invalidate_on_ddl(target, connection, **kw):
+    index = _indexes.get(connection.engine)
+    if index is not None:
+        index.invalidate()
+
+event.listen(models.vaga_competencia, "after_create", _invalidate_on_ddl)
+event.listen(models.vaga_competencia, "after_drop", _invalidate_on_ddl)
@@ -1,38 +1,137 @@
-from fastapi import APIRouter, Depends, HTTPException
+import anyio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
-from app.database import get_db
+from typing import Optional
+from app.cache.response import RESPONSE_CACHE_TTL, cached
+from app.responses import ORJSONResponse
+from app.database import get_db, get_async_db
 from . import schemas, functions
 from app.model import models
+from app.dependencies import etag
 from app.dependencies.auth import get_current_admin, get_current_user, get_current_regular_user
 
 router = APIRouter(prefix="/vagas", tags=["Vagas"])
 
+# Hot read routes run on the async engine; the sync query functions execute
+# inside AsyncSession.run_sync and are serialized there, so lazy loads still work.
+def _search_vagas(db: Session, q: str, limit: int, offset: int):
+    return [schemas.Vaga.model_validate(vaga, from_attributes=True) for vaga in functions.search_vagas(db, q, limit=limit, offset=offset)]
+
+def _list_vagas_by_empresa(db: Session, empresa_id: int):
+    return [schemas.Vaga.model_validate(vaga, from_attributes=True) for vaga in functions.get_vagas_by_empresa(db, empresa_id)]
+
+def _get_vaga(db: Session, vaga_id: int):
+    vaga = functions.get_vaga(db, vaga_id)
+    if not vaga:
+        return None
+    return schemas.Vaga.model_validate(vaga, from_attributes=True), vaga.version
+
 @router.post("/", response_model=schemas.Vaga)
 def create_vaga(vaga: schemas.VagaCreate, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
     created = functions.create_vagaemprego(db, vaga)
     return created
 
+def _iter_request_body(request: Request):
+    # Pulls the upload from the event loop while the import runs in a worker thread
+    stream = request.stream()
+    while True:
+        try:
+            yield anyio.from_thread.run(stream.__anext__)
+        except StopAsyncIteration:
+            return
+
+@router.post("/import", response_model=schemas.ImportacaoResultado)
+async def import_vagas(
+    request: Request,
+    formato: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    def run_import():
+        rows = functions.parse_import_rows(functions.iter_lines(_iter_request_body(request)), formato)
+        return functions.import_vagas(db, current_admin["id"], rows)
+
+    return await run_in_threadpool(run_import)
+
 @router.put("/{vaga_id}", response_model=schemas.Vaga)
-def update_vaga(vaga_id: int, vaga_update: schemas.VagaUpdate, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
-    updated = functions.update_vaga(db, vaga_id, vaga_update)
+def update_vaga(
+    vaga_id: int,
+    vaga_update: schemas.VagaUpdate,
+    response: Response,
+    versions: Optional[list[int]] = Depends(etag.if_match),
+    db: Session = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    updated = functions.update_vaga(db, vaga_id, vaga_update, versions)
     if not updated:
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
+    etag.set_headers(response, updated.version)
     return updated
 
 @router.delete("/{vaga_id}", response_model=schemas.Vaga)
-def delete_vaga(vaga_id: int, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
-    deleted = functions.delete_vaga(db, vaga_id)
+def delete_vaga(
+    vaga_id: int,
+    versions: Optional[list[int]] = Depends(etag.if_match),
+    db: Session = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    deleted = functions.delete_vaga(db, vaga_id, versions)
     if not deleted:
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
     return deleted
 
 @router.get("/", response_model=list[schemas.Vaga])
-def list_vagas(db: Session = Depends(get_db)):
-    return functions.get_vagas(db)
+@cached(ttl=RESPONSE_CACHE_TTL, tags=("vagas",))
+async def list_vagas(
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    modalidade: Optional[str] = None,
+    salario_min: Optional[float] = Query(None, ge=0),
+    salario_max: Optional[float] = Query(None, ge=0),
+    empresa_id: Optional[int] = None,
+    competencia_ids: Optional[list[int]] = Query(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # The collection version is read first, so the ETag is never newer than the body
+    version = await db.run_sync(functions.get_vagas_version)
+    if version is not None and etag.none_match(if_none_match, version):
+        return etag.not_modified(version, etag.COLLECTION_CACHE_CONTROL)
+
+    # Column records serialized as is, skipping ORM objects and schema validation
+    vagas, next_cursor = await db.run_sync(
+        functions.get_vagas_records,
+        cursor=cursor,
+        limit=limit,
+        modalidade=modalidade,
+        salario_min=salario_min,
+        salario_max=salario_max,
+        empresa_id=empresa_id,
+        competencia_ids=competencia_ids,
+    )
+    response = ORJSONResponse(vagas)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    if version is not None:
+        etag.set_headers(response, version, etag.COLLECTION_CACHE_CONTROL)
+    return response
+
+@router.get("/search", response_model=list[schemas.Vaga])
+async def search_vagas(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(_search_vagas, q, limit, offset)
 
 @router.get("/empresa/{empresa_id}", response_model=list[schemas.Vaga])
-def list_vagas_by_empresa(empresa_id: int, db: Session = Depends(get_db)):
-    vagas = functions.get_vagas_by_empresa(db, empresa_id)
+@cached(ttl=RESPONSE_CACHE_TTL, tags=("vagas",))
+async def list_vagas_by_empresa(empresa_id: int, db: AsyncSession = Depends(get_async_db)):
+    vagas = await db.run_sync(_list_vagas_by_empresa, empresa_id)
     if not vagas:
         raise HTTPException(status_code=404, detail="No vagas found for this empresa")
     return vagas
@@ -48,6 +147,14 @@ def apply_to_vaga(vaga_id: int, user_id: int, db: Session = Depends(get_db), cur
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+@router.post("/competencias/attach", response_model=schemas.CompetenciasLoteResultado)
+def attach_competencias(lote: schemas.VagaCompetenciasLote, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
+    return functions.attach_competencias_to_vagas(db, lote.vaga_ids, lote.competencia_ids, current_admin["id"], lote.empresa_id)
+
+@router.post("/competencias/detach", response_model=schemas.CompetenciasLoteResultado)
+def detach_competencias(lote: schemas.VagaCompetenciasLote, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
+    return functions.detach_competencias_from_vagas(db, lote.vaga_ids, lote.competencia_ids, current_admin["id"], lote.empresa_id)
+
 @router.post("/{vaga_id}/competencias/{competencia_id}")
 def add_competencia(vaga_id: int, competencia_id: int, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
     added = functions.add_competencia_to_vaga(db, vaga_id, competencia_id)
@@ -69,12 +176,58 @@ def clear_competencias(vaga_id: int, db: Session = Depends(get_db), current_admi
 def list_competencias(vaga_id: int, db: Session = Depends(get_db), all_users: dict = Depends(get_current_user)):
     return functions.get_vaga_competencias(db, vaga_id)
 
+@router.get("/{vaga_id}/candidates/ranked", response_model=list[schemas.CandidatoRanqueado])
+def list_ranked_candidates(
+    vaga_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    return functions.rank_candidates(db, vaga_id, current_admin["id"], limit=limit, offset=offset)
+
 @router.get("/admin-with-applications", response_model=list[schemas.VagaWithUsers])
 def get_vagas_application_for_admin(db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
     return functions.get_vagas_with_applications_for_admin(db, current_admin["id"])
 
+@router.get("/admin-with-applications/export")
+def export_vagas_application_for_admin(
+    formato: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_db),
+    current_admin: dict = Depends(get_current_admin),
+):
+    chunks = functions.iter_applications_for_admin(db, current_admin["id"])
+    if formato == "csv":
+        return StreamingResponse(
+            functions.export_applications_csv(chunks),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="candidaturas.csv"'},
+        )
+    return StreamingResponse(functions.export_applications_ndjson(chunks), media_type="application/x-ndjson")
+
 @router.get("/admin", response_model=list[schemas.Vaga])
 def get_vagas_for_admin(db: Session = Depends(get_db), current_admin: dict = Depends(get_current_admin)):
     admin_id = current_admin["id"]
     vagas = functions.get_vagas_by_admin(db, admin_id)
-    return vagas
\ No newline at end of file
+    return vagas
+
+# Declared last so the static GET routes above take precedence over /{vaga_id}
+@router.get("/{vaga_id}", response_model=schemas.Vaga)
+async def get_vaga(
+    vaga_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Revalidation only reads the version, without loading or serializing the vaga
+    if if_none_match is not None:
+        version = await db.run_sync(functions.get_vaga_version, vaga_id)
+        if version is not None and etag.none_match(if_none_match, version):
+            return etag.not_modified(version)
+
+    found = await db.run_sync(_get_vaga, vaga_id)
+    if not found:
+        raise HTTPException(status_code=404, detail="Vaga não encontrada")
+    vaga, version = found
+    etag.set_headers(response, version)
+    return vaga
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from app.competencia.schemas import Competencia
 from typing import Optional
 from typing import List
@@ -42,4 +42,35 @@ class VagaWithUsers(BaseModel):
     users: List[UserInVaga] = []
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class CandidatoRanqueado(BaseModel):
+    id: int
+    nome: str
+    score: int
+    competencias_em_comum: int
+    anos_experiencia: int
+
+class ErroImportacao(BaseModel):
+    linha: int
+    erro: str
+
+class ImportacaoResultado(BaseModel):
+    total: int
+    importadas: int
+    total_erros: int
+    erros: list[ErroImportacao] = []
+
+class VagaCompetenciasLote(BaseModel):
+    vaga_ids: list[int] = Field(default=[], max_length=1000)
+    empresa_id: Optional[int] = None
+    competencia_ids: list[int] = Field(min_length=1, max_length=100)
+
+class ResultadoCompetenciaLote(BaseModel):
+    vaga_id: int
+    competencia_id: int
+    status: str
+
+class CompetenciasLoteResultado(BaseModel):
+    resumo: dict[str, int]
+    resultados: list[ResultadoCompetenciaLote]
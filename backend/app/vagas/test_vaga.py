@@ -1,13 +1,19 @@
+import json
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.user import functions as user_functions, schemas as user_schemas
 from app.vagas import functions as vagas_functions, schemas as vagas_schemas
 from app.empresa import functions as empresa_functions, schemas as empresa_schemas
 from app.admin import functions as admin_functions, schemas as admin_schemas
 from app.competencia import functions as competencia_functions, schemas as competencia_schemas
-from app.database import Base, get_db
+from app.experiencia import functions as experiencia_functions, schemas as experiencia_schemas
+from app.database import Base, get_db, get_async_db
 from app.main import app
 
 # Unit tests
@@ -274,6 +280,481 @@ def test_get_vaga_competencia(db):
     assert fetched is not None
     assert fetched.nome == "Python Avançado"
 
+def test_get_vagas_paginated_and_filtered(db):
+    admin_data = admin_schemas.AdminCreate(
+        nome="Marcus",
+        cpf="123.456.789-00",
+        email="Marcus@admin.com",
+        telefone="9999-9999",
+        password="adminpasstest"
+    )
+
+    empresa_data = empresa_schemas.EmpresaCreate(
+        nome="EmpresaCorp",
+        descricao="Empresa para testes",
+        cidade="Brasilia",
+        cep="12345678-12",
+        no_empregados=15,
+        anos_func=3,
+        admin_id=1
+    )
+
+    admin_functions.create_admin(db, admin_data)
+    empresa_functions.create_empresa(db, empresa_data)
+    python = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Python"))
+    sql = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="SQL"))
+
+    for i in range(5):
+        vaga = vagas_functions.create_vagaemprego(db, vagas_schemas.VagaCreate(
+            titulo=f"Vaga {i}",
+            descricao="Vaga para testar filtros",
+            modalidade="Remoto" if i % 2 == 0 else "Presencial",
+            salario=1000.0 * (i + 1),
+            no_vagas=1,
+            empresa_id=1
+        ))
+        vagas_functions.add_competencia_to_vaga(db, vaga.id, python.id)
+        if i >= 3:
+            vagas_functions.add_competencia_to_vaga(db, vaga.id, sql.id)
+
+    page, next_cursor = vagas_functions.get_vagas(db, limit=2)
+    assert [v.titulo for v in page] == ["Vaga 0", "Vaga 1"]
+    assert next_cursor == page[-1].id
+
+    page, next_cursor = vagas_functions.get_vagas(db, cursor=next_cursor, limit=2)
+    assert [v.titulo for v in page] == ["Vaga 2", "Vaga 3"]
+
+    page, next_cursor = vagas_functions.get_vagas(db, cursor=next_cursor, limit=2)
+    assert [v.titulo for v in page] == ["Vaga 4"]
+    assert next_cursor is None
+
+    remotas, _ = vagas_functions.get_vagas(db, modalidade="Remoto", salario_min=2000, salario_max=5000)
+    assert [v.titulo for v in remotas] == ["Vaga 2", "Vaga 4"]
+
+    com_sql, _ = vagas_functions.get_vagas(db, competencia_ids=[python.id, sql.id])
+    assert [v.titulo for v in com_sql] == ["Vaga 3", "Vaga 4"]
+
+    assert vagas_functions.get_vagas(db, empresa_id=2)[0] == []
+
+    # The column-projected path serves the same pages, already shaped like the schema
+    for filters in ({"limit": 2}, {"cursor": 2, "limit": 2}, {"modalidade": "Remoto", "salario_min": 2000},
+                    {"competencia_ids": [python.id, sql.id]}, {"empresa_id": 2}):
+        page, next_cursor = vagas_functions.get_vagas(db, **filters)
+        records, records_cursor = vagas_functions.get_vagas_records(db, **filters)
+        assert records == [vagas_schemas.Vaga.model_validate(v, from_attributes=True).model_dump() for v in page]
+        assert records_cursor == next_cursor
+    records, _ = vagas_functions.get_vagas_records(db, competencia_ids=[sql.id])
+    assert list(records[0]) == list(vagas_schemas.Vaga.model_fields)
+    assert records[0]["competencias"] == [{"nome": "Python", "id": python.id}, {"nome": "SQL", "id": sql.id}]
+
+def test_search_vagas(db):
+    admin_data = admin_schemas.AdminCreate(
+        nome="Marcus",
+        cpf="123.456.789-00",
+        email="Marcus@admin.com",
+        telefone="9999-9999",
+        password="adminpasstest"
+    )
+
+    empresa_data = empresa_schemas.EmpresaCreate(
+        nome="EmpresaCorp",
+        descricao="Empresa para testes",
+        cidade="Brasilia",
+        cep="12345678-12",
+        no_empregados=15,
+        anos_func=3,
+        admin_id=1
+    )
+
+    admin_functions.create_admin(db, admin_data)
+    empresa_functions.create_empresa(db, empresa_data)
+
+    vagas = [
+        ("Analista de dados", "Trabalho com Python e SQL"),
+        ("Desenvolvedor Python", "Backend com FastAPI e Python"),
+        ("Designer", "Criação de peças gráficas"),
+    ]
+    for titulo, descricao in vagas:
+        vagas_functions.create_vagaemprego(db, vagas_schemas.VagaCreate(
+            titulo=titulo,
+            descricao=descricao,
+            modalidade="Remoto",
+            salario=3000.0,
+            no_vagas=1,
+            empresa_id=1
+        ))
+
+    found = vagas_functions.search_vagas(db, "python")
+    assert [v.titulo for v in found] == ["Desenvolvedor Python", "Analista de dados"]
+
+    assert [v.titulo for v in vagas_functions.search_vagas(db, "criacao")] == ["Designer"]
+    assert [v.titulo for v in vagas_functions.search_vagas(db, "python", limit=1, offset=1)] == ["Analista de dados"]
+    assert vagas_functions.search_vagas(db, "\"*") == []
+
+    designer = vagas_functions.search_vagas(db, "designer")[0]
+    vagas_functions.update_vaga(db, designer.id, vagas_schemas.VagaUpdate(titulo="Designer Python"))
+    assert len(vagas_functions.search_vagas(db, "python")) == 3
+
+    vagas_functions.delete_vaga(db, designer.id)
+    assert vagas_functions.search_vagas(db, "designer") == []
+
+def test_rank_candidates(db):
+    admin_data = admin_schemas.AdminCreate(
+        nome="Marcus",
+        cpf="123.456.789-00",
+        email="Marcus@admin.com",
+        telefone="9999-9999",
+        password="adminpasstest"
+    )
+
+    empresa_data = empresa_schemas.EmpresaCreate(
+        nome="EmpresaCorp",
+        descricao="Empresa para testes",
+        cidade="Brasilia",
+        cep="12345678-12",
+        no_empregados=15,
+        anos_func=3,
+        admin_id=1
+    )
+
+    vaga_data = vagas_schemas.VagaCreate(
+        titulo="Vaga estagio",
+        descricao="Uma vaga de estagio simples",
+        modalidade="Estagio",
+        salario=200.50,
+        no_vagas=5,
+        empresa_id=1
+    )
+
+    admin_functions.create_admin(db, admin_data)
+    empresa_functions.create_empresa(db, empresa_data)
+    vaga = vagas_functions.create_vagaemprego(db, vaga_data)
+    python = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Python"))
+    sql = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="SQL"))
+    vagas_functions.add_competencia_to_vaga(db, vaga.id, python.id)
+    vagas_functions.add_competencia_to_vaga(db, vaga.id, sql.id)
+
+    users = []
+    for i, (competencias, anos) in enumerate([([python], 4), ([python, sql], 1), ([], 10)]):
+        user = user_functions.create_user(db, user_schemas.UserCreate(
+            nome=f"Candidato {i}",
+            email=f"candidato{i}@user.com",
+            cpf=f"000.000.000-0{i}",
+            telefone="1234-5678",
+            password="candidatopass",
+            area_trabalho="software",
+            nivel_educacao="superior"
+        ))
+        for comp in competencias:
+            user_functions.add_competencia_to_user(db, user.id, comp.id)
+        experiencia_functions.create_experiencia(db, experiencia_schemas.ExperienciaCreate(
+            cargo="Dev", empresa="Outra", anos=anos, user_id=user.id
+        ))
+        user_functions.apply_to_vaga(db, user.id, vaga.id)
+        users.append(user)
+
+    ranked = vagas_functions.rank_candidates(db, vaga.id, admin_id=1)
+    assert [(c["nome"], c["score"]) for c in ranked] == [
+        ("Candidato 0", 5),
+        ("Candidato 1", 4),
+        ("Candidato 2", 0),
+    ]
+    assert ranked[1]["competencias_em_comum"] == 2
+
+    page = vagas_functions.rank_candidates(db, vaga.id, admin_id=1, limit=1, offset=1)
+    assert [c["nome"] for c in page] == ["Candidato 1"]
+
+    # Another admin's empresa: the vaga doesn't exist for them
+    outro_admin = admin_functions.create_admin(db, admin_schemas.AdminCreate(
+        nome="Outra",
+        cpf="987.654.321-00",
+        email="outra@admin.com",
+        telefone="9999-9999",
+        password="adminpasstest"
+    ))
+    with pytest.raises(HTTPException) as exc_info:
+        vagas_functions.rank_candidates(db, vaga.id, admin_id=outro_admin.id)
+    assert exc_info.value.status_code == 404
+
+def test_export_applications_for_admin(db):
+    admin_data = admin_schemas.AdminCreate(
+        nome="Marcus",
+        cpf="123.456.789-00",
+        email="Marcus@admin.com",
+        telefone="9999-9999",
+        password="adminpasstest"
+    )
+
+    empresa_data = empresa_schemas.EmpresaCreate(
+        nome="EmpresaCorp",
+        descricao="Empresa para testes",
+        cidade="Brasilia",
+        cep="12345678-12",
+        no_empregados=15,
+        anos_func=3,
+        admin_id=1
+    )
+
+    vaga_data = vagas_schemas.VagaCreate(
+        titulo="Vaga estagio",
+        descricao="Uma vaga de estagio simples",
+        modalidade="Estagio",
+        salario=200.50,
+        no_vagas=5,
+        empresa_id=1
+    )
+
+    admin = admin_functions.create_admin(db, admin_data)
+    empresa_functions.create_empresa(db, empresa_data)
+    vaga = vagas_functions.create_vagaemprego(db, vaga_data)
+    for i in range(3):
+        user = user_functions.create_user(db, user_schemas.UserCreate(
+            nome=f"Candidato, {i}",
+            email=f"candidato{i}@user.com",
+            cpf=f"000.000.000-0{i}",
+            telefone="1234-5678",
+            password="candidatopass",
+            area_trabalho="software",
+            nivel_educacao="superior"
+        ))
+        user_functions.apply_to_vaga(db, user.id, vaga.id)
+
+    chunks = list(vagas_functions.iter_applications_for_admin(db, admin.id, chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+
+    ndjson = "".join(vagas_functions.export_applications_ndjson(iter(chunks))).splitlines()
+    assert len(ndjson) == 3
+    assert '"nome": "Candidato, 0"' in ndjson[0]
+
+    csv_lines = "".join(vagas_functions.export_applications_csv(iter(chunks))).splitlines()
+    assert csv_lines[0] == "vaga_id,titulo,empresa_id,user_id,nome,email"
+    assert csv_lines[1].startswith(f'{vaga.id},Vaga estagio,1,1,"Candidato, 0"')
+    assert len(csv_lines) == 4
+
+    assert list(vagas_functions.iter_applications_for_admin(db, admin.id + 1)) == []
+
+def test_import_vagas(db):
+    admin_data = admin_schemas.AdminCreate(
+        nome="Marcus",
+        cpf="123.456.789-00",
+        email="Marcus@admin.com",
+        telefone="9999-9999",
+        password="adminpasstest"
+    )
+
+    empresa_data = empresa_schemas.EmpresaCreate(
+        nome="EmpresaCorp",
+        descricao="Empresa para testes",
+        cidade="Brasilia",
+        cep="12345678-12",
+        no_empregados=15,
+        anos_func=3,
+        admin_id=1
+    )
+
+    admin = admin_functions.create_admin(db, admin_data)
+    empresa = empresa_functions.create_empresa(db, empresa_data)
+    python = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Python"))
+    sql = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="SQL"))
+
+    def vaga(titulo, **extra):
+        return json.dumps({
+            "titulo": titulo, "descricao": "Importada", "modalidade": "Remoto",
+            "salario": 3000, "no_vagas": 2, "empresa_id": empresa.id, **extra,
+        })
+
+    ndjson = "\n".join([
+        vaga("Dev Python", competencias=["Python", "SQL"]),
+        "{quebrado",
+        vaga("Sem salario", salario="muito"),
+        vaga("Outra empresa", empresa_id=empresa.id + 1),
+        vaga("Dev Rust", competencias=["Rust"]),
+        "",
+        vaga("Analista"),
+    ]).encode()
+    chunks = [ndjson[i:i + 7] for i in range(0, len(ndjson), 7)]
+
+    rows = vagas_functions.parse_import_rows(vagas_functions.iter_lines(chunks), "ndjson")
+    result = vagas_functions.import_vagas(db, admin.id, rows, chunk_size=2)
+
+    assert result["total"] == 6
+    assert result["importadas"] == 2
+    assert result["total_erros"] == 4
+    assert [e["linha"] for e in result["erros"]] == [2, 3, 4, 5]
+    assert result["erros"][1]["erro"].startswith("salario:")
+    assert result["erros"][2]["erro"] == "Empresa não encontrada"
+    assert result["erros"][3]["erro"] == "Competência não encontrada: Rust"
+
+    csv_body = (
+        "titulo,descricao,modalidade,salario,no_vagas,empresa_id,competencias\n"
+        f'Dev Dados,"Pipelines\nde dados",Remoto,4000,1,{empresa.id},SQL;Python\n'
+        f"Sem vagas,Importada,Remoto,4000,,{empresa.id},\n"
+    ).encode()
+    rows = vagas_functions.parse_import_rows(vagas_functions.iter_lines([csv_body]), "csv")
+    result = vagas_functions.import_vagas(db, admin.id, rows)
+
+    assert result["importadas"] == 1
+    assert [e["linha"] for e in result["erros"]] == [4]
+
+    importadas = {v.titulo: v for v in vagas_functions.get_vagas_by_empresa(db, empresa.id)}
+    assert set(importadas) == {"Dev Python", "Analista", "Dev Dados"}
+    assert {c.nome for c in importadas["Dev Python"].competencias} == {"Python", "SQL"}
+    assert importadas["Dev Dados"].descricao == "Pipelines\nde dados"
+    assert {c.id for c in importadas["Dev Dados"].competencias} == {python.id, sql.id}
+    assert importadas["Analista"].competencias == []
+
+def test_attach_and_detach_competencias_in_batch(db):
+    admin_data = admin_schemas.AdminCreate(
+        nome="Marcus",
+        cpf="123.456.789-00",
+        email="Marcus@admin.com",
+        telefone="9999-9999",
+        password="adminpasstest"
+    )
+
+    empresa_data = empresa_schemas.EmpresaCreate(
+        nome="EmpresaCorp",
+        descricao="Empresa para testes",
+        cidade="Brasilia",
+        cep="12345678-12",
+        no_empregados=15,
+        anos_func=3,
+        admin_id=1
+    )
+
+    admin_functions.create_admin(db, admin_data)
+    empresa = empresa_functions.create_empresa(db, empresa_data)
+    vagas = [
+        vagas_functions.create_vagaemprego(db, vagas_schemas.VagaCreate(
+            titulo=f"Vaga {i}",
+            descricao="Vaga para testes",
+            modalidade="Remoto",
+            salario=1000,
+            no_vagas=1,
+            empresa_id=empresa.id
+        ))
+        for i in range(3)
+    ]
+    java, python = (
+        competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome=nome)).id
+        for nome in ("Java", "Python")
+    )
+    vagas_functions.add_competencia_to_vaga(db, vagas[0].id, java)
+
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine_unit, "before_cursor_execute", count)
+    try:
+        result = vagas_functions.attach_competencias_to_vagas(db, [999], [java, python, 777], admin_id=1, empresa_id=empresa.id)
+    finally:
+        event.remove(engine_unit, "before_cursor_execute", count)
+
+    assert len(statements) <= 6
+    assert result["resumo"] == {"ja_associada": 1, "associada": 5, "competencia_nao_encontrada": 3, "vaga_nao_encontrada": 3}
+    assert {"vaga_id": vagas[0].id, "competencia_id": java, "status": "ja_associada"} in result["resultados"]
+    assert {"vaga_id": 999, "competencia_id": python, "status": "vaga_nao_encontrada"} in result["resultados"]
+
+    result = vagas_functions.detach_competencias_from_vagas(db, [vagas[0].id, vagas[1].id], [java], admin_id=1)
+    assert result["resumo"] == {"removida": 2}
+
+    db.expire_all()
+    assert [c.id for c in vagas[0].competencias] == [python]
+    assert sorted(c.id for c in vagas[2].competencias) == [java, python]
+
+    with pytest.raises(HTTPException) as exc_info:
+        vagas_functions.attach_competencias_to_vagas(db, [], [java], admin_id=1)
+    assert exc_info.value.status_code == 400
+
+def test_batch_competencias_caps_empresa_scope(db, monkeypatch):
+    empresa = empresa_functions.create_empresa(db, empresa_schemas.EmpresaCreate(
+        nome="EmpresaCorp",
+        descricao="Empresa para testes",
+        cidade="Brasilia",
+        cep="12345678-12",
+        no_empregados=15,
+        anos_func=3,
+        admin_id=1
+    ))
+    vagas = [
+        vagas_functions.create_vagaemprego(db, vagas_schemas.VagaCreate(
+            titulo=f"Vaga {i}",
+            descricao="Vaga para testes",
+            modalidade="Remoto",
+            salario=1000,
+            no_vagas=1,
+            empresa_id=empresa.id
+        ))
+        for i in range(3)
+    ]
+    java = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Java")).id
+    monkeypatch.setattr(vagas_functions, "MAX_VAGAS_LOTE", 2)
+
+    with pytest.raises(HTTPException) as exc_info:
+        vagas_functions.attach_competencias_to_vagas(db, [], [java], admin_id=1, empresa_id=empresa.id)
+    assert exc_info.value.status_code == 400
+    db.expire_all()
+    assert all(v.competencias == [] for v in vagas)
+
+    result = vagas_functions.attach_competencias_to_vagas(db, [vagas[0].id, vagas[1].id], [java], admin_id=1)
+    assert result["resumo"] == {"associada": 2}
+
+    # Another admin can't reach these vagas, by id or by empresa
+    result = vagas_functions.attach_competencias_to_vagas(db, [vagas[2].id], [java], admin_id=2, empresa_id=empresa.id)
+    assert result["resumo"] == {"vaga_nao_encontrada": 1}
+    db.expire_all()
+    assert vagas[2].competencias == []
+
+    # A pair linked twice (two racing batches) is rejected by the unique index
+    with pytest.raises(IntegrityError):
+        db.execute(vagas_functions.models.vaga_competencia.insert().values(vaga_id=vagas[0].id, competencia_id=java))
+    db.rollback()
+
+def test_update_and_delete_vaga_with_versions(db):
+    admin = admin_functions.create_admin(db, admin_schemas.AdminCreate(
+        nome="Marcus",
+        cpf="123.456.789-00",
+        email="Marcus@admin.com",
+        telefone="9999-9999",
+        password="adminpasstest"
+    ))
+    empresa = empresa_functions.create_empresa(db, empresa_schemas.EmpresaCreate(
+        nome="EmpresaCorp",
+        descricao="Empresa para testes",
+        cidade="Brasilia",
+        cep="12345678-12",
+        no_empregados=15,
+        anos_func=3,
+        admin_id=admin.id
+    ))
+    vaga = vagas_functions.create_vagaemprego(db, vagas_schemas.VagaCreate(
+        titulo="Vaga",
+        descricao="Vaga para testes",
+        modalidade="Remoto",
+        salario=1000,
+        no_vagas=1,
+        empresa_id=empresa.id
+    ))
+    assert vaga.version == 1
+
+    updated = vagas_functions.update_vaga(db, vaga.id, vagas_schemas.VagaUpdate(titulo="Primeira"), versions=[1])
+    assert (updated.titulo, updated.version) == ("Primeira", 2)
+
+    with pytest.raises(HTTPException) as stale:
+        vagas_functions.update_vaga(db, vaga.id, vagas_schemas.VagaUpdate(titulo="Segunda"), versions=[1])
+    assert stale.value.status_code == 412
+    assert vagas_functions.update_vaga(db, 999, vagas_schemas.VagaUpdate(titulo="Segunda"), versions=[1]) is None
+
+    competencia = competencia_functions.create_competencia(db, competencia_schemas.CompetenciaCreate(nome="Python"))
+    vagas_functions.add_competencia_to_vaga(db, vaga.id, competencia.id)
+    assert vagas_functions.get_vaga_version(db, vaga.id) == 3
+
+    with pytest.raises(HTTPException) as stale:
+        vagas_functions.delete_vaga(db, vaga.id, versions=[2])
+    assert stale.value.status_code == 412
+    assert vagas_functions.delete_vaga(db, vaga.id, versions=[3]) is not None
+    assert vagas_functions.get_vaga(db, vaga.id) is None
+
 # Integration tests
 
 SQLALCHEMY_DATABASE_URL_INTEGRATION = "sqlite:///./test_admin_integration.db"
@@ -289,6 +770,17 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# NullPool: TestClient may run each request on a fresh event loop
+SQLALCHEMY_ASYNC_DATABASE_URL_INTEGRATION = "sqlite+aiosqlite:///./test_admin_integration.db"
+async_engine_integration = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL_INTEGRATION, poolclass=NullPool)
+TestingAsyncSessionLocal_integration = async_sessionmaker(async_engine_integration, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal_integration() as db:
+        yield db
+
+app.dependency_overrides[get_async_db] = override_get_async_db
+
 @pytest.fixture(scope="function", autouse=True)
 def setup_and_teardown_db():
     Base.metadata.create_all(bind=engine_integration)
@@ -614,4 +1106,51 @@ def test_vagas_add_list_remove_competencia():
 
     list_resp_deleted = client.get(f"/vagas/{vaga_id}/competencias")
     assert list_resp_deleted.status_code == 200 or list_resp_deleted.status_code == 201
-    assert list_resp_deleted.json() == []
\ No newline at end of file
+    assert list_resp_deleted.json() == []
+
+def test_get_vaga_etag_endpoint():
+    db = TestingSessionLocal_integration()
+    admin = admin_functions.create_admin(db, admin_schemas.AdminCreate(
+        nome="Marcus",
+        cpf="123.456.789-00",
+        email="Marcus@admin.com",
+        telefone="9999-9999",
+        password="adminpasstest"
+    ))
+    empresa = empresa_functions.create_empresa(db, empresa_schemas.EmpresaCreate(
+        nome="EmpresaCorp",
+        descricao="Empresa para testes",
+        cidade="Brasilia",
+        cep="12345678-12",
+        no_empregados=15,
+        anos_func=3,
+        admin_id=admin.id
+    ))
+    vaga_id = vagas_functions.create_vagaemprego(db, vagas_schemas.VagaCreate(
+        titulo="Vaga",
+        descricao="Vaga para testes",
+        modalidade="Remoto",
+        salario=1000,
+        no_vagas=1,
+        empresa_id=empresa.id
+    )).id
+
+    response = client.get(f"/vagas/{vaga_id}")
+    assert response.status_code == 200
+    assert response.json()["titulo"] == "Vaga"
+    etag = response.headers["ETag"]
+
+    not_modified = client.get(f"/vagas/{vaga_id}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.content == b""
+
+    vagas_functions.update_vaga(db, vaga_id, vagas_schemas.VagaUpdate(titulo="Vaga nova"))
+    db.close()
+
+    changed = client.get(f"/vagas/{vaga_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["titulo"] == "Vaga nova"
+    assert changed.headers["ETag"] != etag
+
+    assert client.get("/vagas/999").status_code == 404
@@ -0,0 +1,299 @@
+"""Throughput and latency percentiles for every API endpoint.
+
+Usage (from backend/):
+    python -m benchmarks.bench_endpoints --scale small --output results.json
+    python -m benchmarks.bench_endpoints --no-seed --only vagas --requests 500
+    python -m benchmarks.compare baseline.json results.json
+
+Seeds a synthetic dataset (see benchmarks.seed) and then drives each endpoint
+in-process through the ASGI app, or against a running server with --base-url
+(seeding still goes to DATABASE_URL, which must be the server's database).
+Runs against a throwaway SQLite database unless DATABASE_URL is set.
+Write endpoints that delete rows only delete rows created earlier in the run.
+"""
+import argparse
+import asyncio
+import os
+import platform
+import random
+import re
+import subprocess
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from benchmarks import seed as seeding
+from benchmarks.common import summarize, use_default_database, write_result
+
+@dataclass
+class Case:
+    name: str
+    method: str
+    path: Callable
+    role: Optional[str] = None
+    params: Optional[Callable] = None
+    json: Optional[Callable] = None
+    # response JSON id is stored under this key for later cases to reuse
+    creates: Optional[str] = None
+    statuses: Counter = field(default_factory=Counter)
+
+class Context:
+    def __init__(self, volumes: dict, rng: random.Random):
+        self.volumes = volumes
+        self.rng = rng
+        self.created = {}
+        self.counter = 0
+
+    def pick(self, name: str) -> int:
+        return self.rng.randint(1, self.volumes[name])
+
+    def unique(self) -> int:
+        self.counter += 1
+        return self.counter
+
+    def remember(self, name: str, value):
+        self.created.setdefault(name, []).append(value)
+        return value
+
+    def take(self, name: str, default=0):
+        # Consumes a row created by an earlier case, so deletes never touch seeded data
+        created = self.created.get(name)
+        return created.pop() if created else default
+
+    def peek(self, name: str) -> int:
+        # Prefers rows created in this run; falls back to seeded ones under --only
+        created = self.created.get(name)
+        return self.rng.choice(created) if created else self.pick(name)
+
+def _vaga_payload(ctx):
+    return {
+        "titulo": "Desenvolvedor Python Benchmark", "descricao": "Vaga criada pelo benchmark",
+        "modalidade": "remoto", "salario": 5000.0, "no_vagas": 3, "empresa_id": ctx.pick("empresas"),
+    }
+
+def _person_payload(ctx, prefix):
+    n = ctx.unique()
+    return {
+        "nome": f"Bench {n}", "cpf": f"{prefix}-bench-{n}-{time.time_ns()}",
+        "email": f"{prefix}-bench-{n}-{time.time_ns()}@bench.local", "telefone": "0000-0000",
+        "password": "benchpassword",
+    }
+
+def build_cases():
+    return [
+        Case("competencias.list", "GET", lambda ctx: "/competencias/"),
+        Case("competencias.create", "POST", lambda ctx: "/competencias/", role="admin",
+             json=lambda ctx: {"nome": f"Bench {ctx.unique()}-{time.time_ns()}"}, creates="competencias"),
+        Case("competencias.delete", "DELETE", lambda ctx: f"/competencias/{ctx.take('competencias')}", role="admin"),
+
+        Case("empresas.list", "GET", lambda ctx: "/empresas/"),
+        Case("empresas.admin", "GET", lambda ctx: "/empresas/admin", role="admin"),
+        Case("empresas.create", "POST", lambda ctx: "/empresas/", role="admin", creates="empresas",
+             json=lambda ctx: {
+                 "nome": "Empresa Benchmark", "descricao": "Criada pelo benchmark", "cidade": "Recife",
+                 "cep": "50000000", "no_empregados": 10, "anos_func": 1, "admin_id": 1,
+             }),
+        Case("empresas.update", "PUT", lambda ctx: f"/empresas/{ctx.pick('empresas')}", role="admin",
+             json=lambda ctx: {"no_empregados": ctx.rng.randint(5, 5000)}),
+        Case("empresas.delete", "DELETE", lambda ctx: f"/empresas/{ctx.take('empresas')}", role="admin"),
+
+        Case("vagas.list", "GET", lambda ctx: "/vagas/"),
+        Case("vagas.list_cursor", "GET", lambda ctx: "/vagas/",
+             params=lambda ctx: {"cursor": ctx.pick("vagas"), "limit": 50}),
+        Case("vagas.list_filtered", "GET", lambda ctx: "/vagas/",
+             params=lambda ctx: {
+                 "modalidade": "remoto", "salario_min": 3000, "salario_max": 15000,
+                 "competencia_ids": [ctx.pick("competencias")],
+             }),
+        Case("vagas.search", "GET", lambda ctx: "/vagas/search",
+             params=lambda ctx: {"q": ctx.rng.choice(["python", "dados", "engenheiro de software", "sênior"])}),
+        Case("vagas.by_empresa", "GET", lambda ctx: f"/vagas/empresa/{ctx.pick('empresas')}"),
+        Case("vagas.admin", "GET", lambda ctx: "/vagas/admin", role="admin"),
+        Case("vagas.admin_applications", "GET", lambda ctx: "/vagas/admin-with-applications", role="admin"),
+        Case("vagas.export_ndjson", "GET", lambda ctx: "/vagas/admin-with-applications/export", role="admin",
+             params=lambda ctx: {"format": "ndjson"}),
+        Case("vagas.export_csv", "GET", lambda ctx: "/vagas/admin-with-applications/export", role="admin",
+             params=lambda ctx: {"format": "csv"}),
+        Case("vagas.competencias", "GET", lambda ctx: f"/vagas/{ctx.pick('vagas')}/competencias", role="user"),
+        Case("vagas.ranked_candidates", "GET", lambda ctx: f"/vagas/{ctx.pick('vagas')}/candidates/ranked", role="admin"),
+        Case("vagas.create", "POST", lambda ctx: "/vagas/", role="admin", json=_vaga_payload, creates="vagas"),
+        Case("vagas.update", "PUT", lambda ctx: f"/vagas/{ctx.pick('vagas')}", role="admin",
+             json=lambda ctx: {"salario": float(ctx.rng.randrange(1500, 25000, 50))}),
+        Case("vagas.apply", "POST", lambda ctx: f"/vagas/{ctx.pick('vagas')}/apply/{ctx.pick('users')}", role="user"),
+        Case("vagas.add_competencia", "POST",
+             lambda ctx: "/vagas/{}/competencias/{}".format(
+                 *ctx.remember("vaga_competencias", (ctx.peek("vagas"), ctx.pick("competencias")))
+             ), role="admin"),
+        Case("vagas.remove_competencia", "DELETE",
+             lambda ctx: "/vagas/{}/competencias/{}".format(*ctx.take("vaga_competencias", (0, 0))), role="admin"),
+        Case("vagas.clear_competencias", "DELETE", lambda ctx: f"/vagas/{ctx.peek('vagas')}/competencias", role="admin"),
+        Case("vagas.delete", "DELETE", lambda ctx: f"/vagas/{ctx.take('vagas')}", role="admin"),
+
+        Case("users.me", "GET", lambda ctx: "/users/me", role="user"),
+        Case("users.competencias", "GET", lambda ctx: f"/users/{ctx.pick('users')}/competencias"),
+        Case("users.recommended_vagas", "GET", lambda ctx: f"/users/{ctx.pick('users')}/recommended-vagas"),
+        Case("users.applications", "GET", lambda ctx: f"/users/{ctx.pick('users')}/applications"),
+        Case("users.create", "POST", lambda ctx: "/users/", creates="users",
+             json=lambda ctx: {**_person_payload(ctx, "user"), "area_trabalho": "software", "nivel_educacao": "superior"}),
+        Case("users.update", "PUT", lambda ctx: f"/users/{ctx.pick('users')}", role="user",
+             json=lambda ctx: {"area_trabalho": ctx.rng.choice(seeding.AREAS)}),
+        Case("users.add_competencia", "POST",
+             lambda ctx: "/users/{}/competencias/{}".format(
+                 *ctx.remember("user_competencias", (ctx.peek("users"), ctx.pick("competencias")))
+             ), role="user"),
+        Case("users.remove_competencia", "DELETE",
+             lambda ctx: "/users/{}/competencias/{}".format(*ctx.take("user_competencias", (0, 0))), role="user"),
+        Case("users.delete", "DELETE", lambda ctx: f"/users/{ctx.take('users')}", role="user"),
+
+        Case("experiencias.by_user", "GET", lambda ctx: f"/experiencias/user/{ctx.pick('users')}"),
+        Case("experiencias.create", "POST", lambda ctx: "/experiencias/", role="user", creates="experiencias",
+             json=lambda ctx: {"cargo": "Benchmark", "empresa": "Empresa 1", "anos": 1, "user_id": ctx.pick("users")}),
+        Case("experiencias.update", "PUT", lambda ctx: f"/experiencias/{ctx.peek('experiencias')}", role="user",
+             json=lambda ctx: {"anos": ctx.rng.randint(1, 10)}),
+        Case("experiencias.delete", "DELETE", lambda ctx: f"/experiencias/{ctx.take('experiencias')}", role="user"),
+
+        Case("admins.me", "GET", lambda ctx: "/admins/me", role="admin"),
+        Case("admins.create", "POST", lambda ctx: "/admins/", json=lambda ctx: _person_payload(ctx, "admin"),
+             creates="admins"),
+        Case("admins.update", "PUT", lambda ctx: f"/admins/{ctx.peek('admins')}", role="admin",
+             json=lambda ctx: {"telefone": f"{ctx.rng.randrange(10**8):08d}"}),
+        Case("admins.delete", "DELETE", lambda ctx: f"/admins/{ctx.take('admins')}", role="admin"),
+    ]
+
+def make_tokens():
+    from jose import jwt
+    from app.dependencies.auth import ALGORITHM, SECRET_KEY
+
+    expires = datetime.now(timezone.utc) + timedelta(hours=1)
+    return {
+        role: jwt.encode(
+            {"sub": f"{role}1@bench.local", "role": role, "id": 1, "exp": expires}, SECRET_KEY, algorithm=ALGORITHM,
+        )
+        for role in ("admin", "user")
+    }
+
+async def run_case(client, case: Case, ctx: Context, tokens: dict, requests: int, concurrency: int, warmup: int):
+    headers = {"Authorization": f"Bearer {tokens[case.role]}"} if case.role else {}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def call(record: bool):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(
+                case.method, case.path(ctx), headers=headers,
+                params=case.params(ctx) if case.params else None,
+                json=case.json(ctx) if case.json else None,
+            )
+            elapsed = time.perf_counter() - start
+        if not record:
+            return
+        latencies.append(elapsed)
+        case.statuses[response.status_code] += 1
+        if case.creates and response.status_code == 200:
+            ctx.remember(case.creates, response.json()["id"])
+
+    if case.method == "GET":
+        for _ in range(warmup):
+            await call(record=False)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(record=True) for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "name": case.name,
+        "method": case.method,
+        "requests": requests,
+        "concurrency": concurrency,
+        **summarize(latencies, elapsed),
+        "statuses": {str(status): count for status, count in sorted(case.statuses.items())},
+        "errors": sum(count for status, count in case.statuses.items() if status >= 500),
+    }
+
+async def run(cases, ctx: Context, requests: int, concurrency: int, warmup: int, base_url: str = None):
+    import httpx
+
+    tokens = make_tokens()
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=60)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    results = []
+    async with client:
+        for case in cases:
+            result = await run_case(client, case, ctx, tokens, requests, concurrency, warmup)
+            print(f"{result['name']:<30} {result['throughput_rps']:>9} req/s  p50 {result['p50_ms']:>8} ms  "
+                  f"p99 {result['p99_ms']:>8} ms  {result['statuses']}", flush=True)
+            results.append(result)
+    return results
+
+def count_volumes(engine) -> dict:
+    from sqlalchemy import func, select
+    from app.model import models
+
+    tables = {
+        "admins": models.Admin.__table__, "empresas": models.Empresa.__table__,
+        "vagas": models.Vagaemprego.__table__, "users": models.User.__table__,
+        "applications": models.user_vaga_association, "competencias": models.Competencia.__table__,
+    }
+    with engine.connect() as conn:
+        return {name: conn.execute(select(func.count()).select_from(table)).scalar() for name, table in tables.items()}
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    seeding.add_volume_args(parser)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the dataset already in DATABASE_URL")
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5, help="untimed requests before each read endpoint")
+    parser.add_argument("--only", help="regex; only run endpoints whose name matches")
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--output", help="write the JSON result to this file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    use_default_database()
+
+    from app.database import engine
+
+    if args.no_seed:
+        dataset = count_volumes(engine)
+    else:
+        dataset = seeding.seed(engine, seeding.volumes_from_args(args), args.seed)
+
+    cases = build_cases()
+    if args.only:
+        cases = [case for case in cases if re.search(args.only, case.name)]
+
+    ctx = Context(count_volumes(engine), random.Random(args.seed))
+    results = asyncio.run(run(cases, ctx, args.requests, args.concurrency, args.warmup, args.base_url))
+
+    write_result({
+        "benchmark": "endpoints",
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "database": engine.dialect.name,
+            "target": args.base_url or "in-process",
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "bcrypt_rounds": os.getenv("BCRYPT_ROUNDS", "12"),
+            "dataset": dataset,
+        },
+        "results": results,
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
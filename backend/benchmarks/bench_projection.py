@@ -0,0 +1,149 @@
+"""Rows/sec and peak memory of the list read paths: ORM objects validated
+through the response schema against column records serialized directly.
+
+Usage (from backend/):
+    python -m benchmarks.bench_projection --scale small --repeat 5
+    python -m benchmarks.bench_projection --no-seed --only vagas --limit 200
+
+Seeds a synthetic dataset (see benchmarks.seed) unless --no-seed is given.
+Runs against a throwaway SQLite database unless DATABASE_URL is set.
+"""
+import argparse
+import gc
+import json
+import re
+import time
+import tracemalloc
+
+from benchmarks import seed as seeding
+from benchmarks.common import use_default_database, write_result
+
+def build_cases(limit: int):
+    from pydantic import TypeAdapter
+    from pydantic_core import to_json
+
+    from app.admin import functions as admin_functions, schemas as admin_schemas
+    from app.empresa import functions as empresa_functions, schemas as empresa_schemas
+    from app.user import functions as user_functions, schemas as user_schemas
+    from app.vagas import functions as vagas_functions, schemas as vagas_schemas
+
+    def orm(load, schema):
+        # What the routes did before: ORM instances, then response_model validation
+        adapter = TypeAdapter(list[schema])
+        def run(db):
+            rows = load(db)
+            return len(rows), adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+        return run
+
+    def records(load):
+        def run(db):
+            rows = load(db)
+            return len(rows), to_json(rows)
+        return run
+
+    return {
+        "vagas": (
+            orm(lambda db: vagas_functions.get_vagas(db, limit=limit)[0], vagas_schemas.Vaga),
+            records(lambda db: vagas_functions.get_vagas_records(db, limit=limit)[0]),
+        ),
+        "empresas": (
+            orm(empresa_functions.get_empresas, empresa_schemas.Empresa),
+            records(empresa_functions.get_empresas_records),
+        ),
+        "users": (
+            orm(user_functions.get_users, user_schemas.User),
+            records(user_functions.get_users_records),
+        ),
+        "admins": (
+            orm(admin_functions.get_admins, admin_schemas.Admin),
+            records(admin_functions.get_admins_records),
+        ),
+    }
+
+def measure(run, repeat: int):
+    from app.database import SessionLocal
+
+    # Untimed warmup so both paths start with compiled statements and a warm cache
+    with SessionLocal() as db:
+        run(db)
+
+    elapsed = 0.0
+    rows = 0
+    for _ in range(repeat):
+        with SessionLocal() as db:
+            gc.collect()
+            start = time.perf_counter()
+            count, body = run(db)
+            elapsed += time.perf_counter() - start
+            rows += count
+
+    with SessionLocal() as db:
+        gc.collect()
+        tracemalloc.start()
+        run(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return body, {
+        "rows": count,
+        "body_bytes": len(body),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed else 0.0,
+        "ms_per_call": round(elapsed / repeat * 1000, 2),
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+def same_content(orm_body: bytes, records_body: bytes) -> bool:
+    # The ORM path leaves nested competencias in whatever order the database
+    # returns them; the records path sorts them by id
+    def normalized(body):
+        rows = json.loads(body)
+        for row in rows:
+            if "competencias" in row:
+                row["competencias"].sort(key=lambda competencia: competencia["id"])
+        return rows
+    return normalized(orm_body) == normalized(records_body)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    seeding.add_volume_args(parser)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the dataset already in DATABASE_URL")
+    parser.add_argument("--repeat", type=int, default=5, help="timed calls per path")
+    parser.add_argument("--limit", type=int, default=200, help="page size for the vagas list")
+    parser.add_argument("--only", help="regex; only run lists whose name matches")
+    parser.add_argument("--output", help="write the JSON result to this file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    use_default_database()
+
+    from app.database import engine
+
+    if args.no_seed:
+        dataset = None
+    else:
+        dataset = seeding.seed(engine, seeding.volumes_from_args(args), args.seed)
+
+    results = {}
+    for name, (orm_path, records_path) in build_cases(args.limit).items():
+        if args.only and not re.search(args.only, name):
+            continue
+        orm_body, orm_result = measure(orm_path, args.repeat)
+        records_body, records_result = measure(records_path, args.repeat)
+        results[name] = {
+            "orm": orm_result,
+            "records": records_result,
+            "speedup": round(records_result["rows_per_sec"] / orm_result["rows_per_sec"], 2) if orm_result["rows_per_sec"] else None,
+            "same_content": same_content(orm_body, records_body),
+        }
+
+    write_result({
+        "benchmark": "projection",
+        "database": engine.dialect.name,
+        "repeat": args.repeat,
+        "dataset": dataset,
+        "results": results,
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Concurrent registration throughput, and read latency while it runs.
+
+Usage (from backend/):
+    python -m benchmarks.bench_registration --requests 256 --concurrency 32
+
+Runs against a throwaway SQLite database unless DATABASE_URL is set.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import percentile, summarize, use_default_database, write_result
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--output", help="write the JSON result to this file")
+    return parser.parse_args()
+
+async def run(requests: int, concurrency: int):
+    import httpx
+    from app.main import app
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    probe_latencies = []
+    done = asyncio.Event()
+
+    async def register(client, i):
+        payload = {
+            "nome": f"Bench {i}",
+            "cpf": f"bench-{i}",
+            "email": f"bench{i}@user.com",
+            "telefone": "0000-0000",
+            "password": "benchpassword",
+            "area_trabalho": "software",
+            "nivel_educacao": "superior",
+        }
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/users/", json=payload)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    async def probe(client):
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/competencias/")
+            probe_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.05)
+
+    async def burst(client):
+        await asyncio.gather(*(register(client, i) for i in range(requests)))
+        done.set()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(burst(client), probe(client))
+        elapsed = time.perf_counter() - start
+
+    summary = summarize(latencies, elapsed)
+    probe_latencies.sort()
+    return {
+        "benchmark": "registration",
+        "requests": requests,
+        "concurrency": concurrency,
+        "bcrypt_rounds": os.getenv("BCRYPT_ROUNDS", "12"),
+        "registrations_per_sec": summary["throughput_rps"],
+        "p50_ms": summary["p50_ms"],
+        "p99_ms": summary["p99_ms"],
+        "read_p50_ms_during_burst": round(percentile(probe_latencies, 0.50) * 1000, 2),
+        "read_max_ms_during_burst": round(probe_latencies[-1] * 1000, 2),
+    }
+
+def main():
+    args = parse_args()
+    use_default_database()
+
+    result = asyncio.run(run(args.requests, args.concurrency))
+    write_result(result, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Serialization throughput of a large GET /vagas/ payload, per JSON path.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization --items 10000
+    python -m benchmarks.bench_serialization --no-seed --items 10000 --repeat 20
+
+Loads the first --items vagas once and then times only the encoding of the
+response body, the way each path would produce it. Seeds a synthetic dataset
+(see benchmarks.seed) with at least --items vagas unless --no-seed is given.
+Runs against a throwaway SQLite database unless DATABASE_URL is set.
+"""
+import argparse
+import gc
+import time
+
+from benchmarks import seed as seeding
+from benchmarks.common import use_default_database, write_result
+
+def build_cases(db, items: int):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+    from pydantic_core import to_json
+
+    from app.responses import ORJSONResponse
+    from app.vagas import functions as vagas_functions, schemas as vagas_schemas
+
+    adapter = TypeAdapter(list[vagas_schemas.Vaga])
+    vagas, _ = vagas_functions.get_vagas(db, limit=items)
+    records, _ = vagas_functions.get_vagas_records(db, limit=items)
+    body = ORJSONResponse(records).body
+
+    return len(records), {
+        # Routes with a response_model: FastAPI validates and dumps with Pydantic
+        "response_model": lambda: adapter.dump_json(adapter.validate_python(vagas, from_attributes=True)),
+        # Routes without one: jsonable_encoder, then the response class
+        "jsonable_json": lambda: JSONResponse(jsonable_encoder(records)).body,
+        "jsonable_orjson": lambda: ORJSONResponse(jsonable_encoder(records)).body,
+        # Column records returned as a response (list_vagas)
+        "records_pydantic": lambda: to_json(records),
+        "records_orjson": lambda: ORJSONResponse(records).body,
+        # Bodies already encoded by a cache layer
+        "pre_encoded": lambda: ORJSONResponse(body).body,
+    }
+
+def measure(encode, items: int, repeat: int) -> dict:
+    encode()
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = encode()
+    elapsed = time.perf_counter() - start
+    return {
+        "ms_per_response": round(elapsed / repeat * 1000, 2),
+        "items_per_sec": round(items * repeat / elapsed),
+        "mb_per_sec": round(len(body) * repeat / elapsed / 1e6, 1),
+        "body_bytes": len(body),
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    seeding.add_volume_args(parser)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the dataset already in DATABASE_URL")
+    parser.add_argument("--items", type=int, default=10_000, help="vagas in the response")
+    parser.add_argument("--repeat", type=int, default=10, help="timed encodings per path")
+    parser.add_argument("--output", help="write the JSON result to this file")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    use_default_database()
+
+    from app.database import SessionLocal, engine
+
+    dataset = None
+    if not args.no_seed:
+        volumes = seeding.volumes_from_args(args)
+        volumes["vagas"] = max(volumes["vagas"], args.items)
+        dataset = seeding.seed(engine, volumes, args.seed)
+
+    with SessionLocal() as db:
+        items, cases = build_cases(db, args.items)
+        results = {name: measure(encode, items, args.repeat) for name, encode in cases.items()}
+
+    write_result({
+        "benchmark": "serialization",
+        "database": engine.dialect.name,
+        "items": items,
+        "repeat": args.repeat,
+        "dataset": dataset,
+        "results": results,
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import json
+import math
+import os
+import tempfile
+
+def use_default_database():
+    # Throwaway SQLite file unless the caller points DATABASE_URL somewhere else;
+    # must run before anything imports app.database.
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    return os.environ["DATABASE_URL"]
+
+def percentile(sorted_values, q: float) -> float:
+    # Nearest-rank percentile over an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+def write_result(result: dict, output: str = None):
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if output:
+        with open(output, "w") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,51 @@
+"""Compare two bench_endpoints results and flag regressions.
+
+Usage (from backend/):
+    python -m benchmarks.compare baseline.json results.json --threshold 0.2
+
+Exits with status 1 when any endpoint's p99 grows, or its throughput drops,
+by more than the threshold (a fraction of the baseline value).
+"""
+import argparse
+import json
+import sys
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    return parser.parse_args()
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return {result["name"]: result for result in json.load(f)["results"]}
+
+def _change(before: float, after: float) -> float:
+    return (after - before) / before if before else 0.0
+
+def compare(baseline: dict, candidate: dict, threshold: float):
+    rows, regressions = [], []
+    for name in baseline.keys() & candidate.keys():
+        before, after = baseline[name], candidate[name]
+        p99 = _change(before["p99_ms"], after["p99_ms"])
+        throughput = _change(before["throughput_rps"], after["throughput_rps"])
+        regressed = p99 > threshold or throughput < -threshold
+        rows.append((name, before["p99_ms"], after["p99_ms"], p99, before["throughput_rps"], after["throughput_rps"], throughput, regressed))
+        if regressed:
+            regressions.append(name)
+    return sorted(rows), sorted(regressions)
+
+def main():
+    args = parse_args()
+    rows, regressions = compare(load(args.baseline), load(args.candidate), args.threshold)
+
+    print(f"{'endpoint':<30} {'p99 ms':>21} {'change':>8} {'req/s':>21} {'change':>8}")
+    for name, p99_before, p99_after, p99, rps_before, rps_after, throughput, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<30} {p99_before:>9} -> {p99_after:>8} {p99:>+8.0%} {rps_before:>9} -> {rps_after:>8} {throughput:>+8.0%}{flag}")
+
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Synthetic dataset for the benchmarks.
+
+Usage (from backend/):
+    python -m benchmarks.seed --scale large
+    python -m benchmarks.seed --vagas 100000 --applications 400000
+
+Drops and recreates every table on DATABASE_URL (a throwaway SQLite file when
+unset). Rows get explicit ids 1..N so benchmarks can address them directly,
+and the same --seed always produces the same data.
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy import func, select
+
+SCALES = {
+    "small": {
+        "admins": 20, "empresas": 100, "vagas": 5_000, "users": 2_000,
+        "applications": 20_000, "competencias": 200,
+    },
+    "medium": {
+        "admins": 100, "empresas": 1_000, "vagas": 50_000, "users": 20_000,
+        "applications": 200_000, "competencias": 1_000,
+    },
+    "large": {
+        "admins": 1_000, "empresas": 10_000, "vagas": 500_000, "users": 200_000,
+        "applications": 2_000_000, "competencias": 5_000,
+    },
+}
+
+COMPETENCIAS_PER_VAGA = 3
+COMPETENCIAS_PER_USER = 5
+EXPERIENCIAS_PER_USER = 2
+CHUNK_SIZE = 10_000
+
+CARGOS = [
+    "Desenvolvedor Python", "Desenvolvedor Java", "Analista de Dados", "Engenheiro de Dados",
+    "Cientista de Dados", "Desenvolvedor Frontend", "Engenheiro DevOps", "Analista de Suporte",
+    "Designer UX", "Gerente de Projetos", "Analista de Segurança", "Engenheiro de Software",
+]
+NIVEIS = ["Júnior", "Pleno", "Sênior", "Estágio"]
+DESCRICOES = [
+    "Atuação com APIs REST, bancos de dados relacionais e testes automatizados.",
+    "Construção de pipelines de dados, ETL e dashboards para o time de negócio.",
+    "Desenvolvimento de interfaces web responsivas com foco em acessibilidade.",
+    "Manutenção de infraestrutura em nuvem, observabilidade e integração contínua.",
+    "Atendimento a clientes internos, documentação de processos e melhoria contínua.",
+]
+MODALIDADES = ["remoto", "presencial", "hibrido"]
+CIDADES = ["São Paulo", "Rio de Janeiro", "Belo Horizonte", "Curitiba", "Porto Alegre", "Recife"]
+AREAS = ["software", "dados", "infraestrutura", "design", "gestão"]
+EDUCACAO = ["medio", "tecnico", "superior", "pos-graduacao"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_volume_args(parser)
+    return parser.parse_args()
+
+def add_volume_args(parser):
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    for name in SCALES["small"]:
+        parser.add_argument(f"--{name}", type=int, help=f"override the number of {name}")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the generated data")
+
+def volumes_from_args(args) -> dict:
+    volumes = dict(SCALES[args.scale])
+    for name in volumes:
+        value = getattr(args, name)
+        if value is not None:
+            volumes[name] = value
+    return volumes
+
+def _insert(conn, table, rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            conn.execute(table.insert(), chunk)
+            chunk = []
+    if chunk:
+        conn.execute(table.insert(), chunk)
+
+def _sample(rng, population: int, k: int):
+    return rng.sample(range(1, population + 1), min(k, population))
+
+def _applications(rng, users: int, vagas: int, total: int):
+    # Spread the applications evenly over users, distinct vagas per user
+    per_user, remainder = divmod(total, users)
+    for user_id in range(1, users + 1):
+        for vaga_id in _sample(rng, vagas, per_user + (user_id <= remainder)):
+            yield {"user_id": user_id, "vaga_id": vaga_id}
+
+def seed(engine, volumes: dict, seed: int = 42) -> dict:
+    from app.database import Base
+    from app.dependencies.utils import hash_password
+    from app.model import models
+
+    rng = random.Random(seed)
+    password = hash_password("benchpassword")
+    admins, empresas, vagas = volumes["admins"], volumes["empresas"], volumes["vagas"]
+    users, competencias = volumes["users"], volumes["competencias"]
+
+    start = time.perf_counter()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        _insert(conn, models.Admin.__table__, (
+            {
+                "id": i, "nome": f"Admin {i}", "cpf": f"admin-{i}", "email": f"admin{i}@bench.local",
+                "telefone": "0000-0000", "hashed_password": password,
+            }
+            for i in range(1, admins + 1)
+        ))
+        _insert(conn, models.Competencia.__table__, (
+            {"id": i, "nome": f"Competência {i}"} for i in range(1, competencias + 1)
+        ))
+        _insert(conn, models.Empresa.__table__, (
+            {
+                "id": i, "nome": f"Empresa {i}", "descricao": rng.choice(DESCRICOES),
+                "cidade": rng.choice(CIDADES), "cep": f"{rng.randrange(10**8):08d}",
+                "no_empregados": rng.randint(5, 5000), "anos_func": rng.randint(1, 50),
+                "admin_id": (i - 1) % admins + 1,
+            }
+            for i in range(1, empresas + 1)
+        ))
+        _insert(conn, models.Vagaemprego.__table__, (
+            {
+                "id": i, "titulo": f"{rng.choice(CARGOS)} {rng.choice(NIVEIS)}",
+                "descricao": rng.choice(DESCRICOES), "modalidade": rng.choice(MODALIDADES),
+                "salario": float(rng.randrange(1500, 25000, 50)), "no_vagas": rng.randint(1, 20),
+                "empresa_id": rng.randint(1, empresas),
+            }
+            for i in range(1, vagas + 1)
+        ))
+        _insert(conn, models.vaga_competencia, (
+            {"vaga_id": vaga_id, "competencia_id": competencia_id}
+            for vaga_id in range(1, vagas + 1)
+            for competencia_id in _sample(rng, competencias, COMPETENCIAS_PER_VAGA)
+        ))
+        _insert(conn, models.User.__table__, (
+            {
+                "id": i, "nome": f"Usuário {i}", "cpf": f"user-{i}", "email": f"user{i}@bench.local",
+                "telefone": "0000-0000", "hashed_password": password,
+                "area_trabalho": rng.choice(AREAS), "nivel_educacao": rng.choice(EDUCACAO),
+            }
+            for i in range(1, users + 1)
+        ))
+        _insert(conn, models.user_competencia, (
+            {"user_id": user_id, "competencia_id": competencia_id}
+            for user_id in range(1, users + 1)
+            for competencia_id in _sample(rng, competencias, COMPETENCIAS_PER_USER)
+        ))
+        _insert(conn, models.Experiencia.__table__, (
+            {
+                "id": (user_id - 1) * EXPERIENCIAS_PER_USER + n + 1, "empresa": f"Empresa {rng.randint(1, empresas)}",
+                "cargo": rng.choice(CARGOS), "anos": rng.randint(1, 10), "user_id": user_id,
+            }
+            for user_id in range(1, users + 1)
+            for n in range(EXPERIENCIAS_PER_USER)
+        ))
+        _insert(conn, models.user_vaga_association, _applications(rng, users, vagas, volumes["applications"]))
+
+        vaga = models.Vagaemprego.__table__
+        association = models.user_vaga_association
+        conn.execute(
+            vaga.update().values(
+                no_candidatos=select(func.count())
+                .where(association.c.vaga_id == vaga.c.id)
+                .scalar_subquery()
+            )
+        )
+
+        if engine.dialect.name == "postgresql":
+            # Explicit ids leave the serial sequences behind
+            for table in ("admins", "competencias", "empresas", "vaga_emprego", "users", "experiencias"):
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), coalesce(max(id), 0) + 1, false) FROM {table}"
+                )
+
+    return {**volumes, "seed": seed, "seconds": round(time.perf_counter() - start, 2)}
+
+def main():
+    from benchmarks.common import use_default_database, write_result
+
+    args = parse_args()
+    url = use_default_database()
+
+    from app.database import engine
+
+    result = seed(engine, volumes_from_args(args), args.seed)
+    write_result({"database": engine.dialect.name, "url": url if url.startswith("sqlite") else None, **result})
+
+if __name__ == "__main__":
+    main()